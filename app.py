@@ -1,26 +1,77 @@
-from flask import Flask, render_template, request, session, jsonify, redirect, url_for, send_file
-import os
+from flask import Flask, render_template, request, session, jsonify, redirect, url_for, send_file, Response, stream_with_context, g
 import json
-from datetime import datetime
+import time
+import itertools
+from sqlalchemy import func
 from config import Config
-from models.database import init_db, SessionLocal
+from models.database import init_db, schema_lock, SessionLocal
 from models.user import User
 from models.organization import Organization
 from models.job import Job
-from models.application import Application
+from models.chat_state import ChatState
+from models.queries import (worker_applications, organization_jobs_with_counts, job_applicants, count_job_applicants,
+                            application_with_job, applicant_skill_overlap, insert_application, export_candidates)
+from models.pagination import page_size
 from utils.ai_assistant import ResumeAssistant
-from utils.skill_extractor import extract_and_categorize_skills
-from utils.job_matcher import match_jobs_for_user
-from utils.resume_generator import generate_ats_resume_content
-from utils.pdf_generator import generate_pdf_resume_from_html
+from utils import task_queue
+from utils.tasks import resume_preview_stages, resume_pdf_source
+from utils import pdf_cache, pdf_renderer
+from utils.bulk_export import stream_resume_zip, NothingExportedError
+from utils.job_matcher import rerank_with_llm
+from utils.ai_pipeline import run_pipeline
 from utils.validators import validate_indian_phone, sanitize_input, validate_required_fields
-from utils.translator import translate_text
+from utils.translator import cached_translation, preload_phrases, claim_untranslated, release_untranslated
+from utils.llm_gateway import cache_stats, coalescing_stats, resilience_stats
+from utils.model_router import router_stats
+from utils import metrics
+from utils.match_store import (refresh_user_matches, refresh_job_matches, get_user_matches,
+                               get_job_matches, get_match, ensure_matches, user_profile, job_profile)
 
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-init_db()
+# PDF render workers are started without fork and re-import this module as
+# __mp_main__ when it is run directly; only the serving process starts up.
+if __name__ != '__mp_main__':
+    # One worker at a time creates tables, migrates and backfills; the others
+    # wait and then find everything in place
+    with schema_lock():
+        init_db()
+        
+        _db = SessionLocal()
+        try:
+            ensure_matches(_db)
+        finally:
+            _db.close()
+    pdf_renderer.init_pool()
+    task_queue.init_app(app)
+    preload_phrases()
+
+@app.template_filter('t')
+def translate_filter(text, language):
+    """Localize a fixed UI phrase from the translation memory. Misses render in
+    English and are translated in the background for next time."""
+    if not text or not language or language == 'en':
+        return text
+    translated = cached_translation(text, language)
+    if translated is None:
+        g.setdefault('untranslated', set()).add((text, language))
+        return text
+    return translated
+
+@app.after_request
+def queue_untranslated_phrases(response):
+    missing = claim_untranslated(g.pop('untranslated', ()))
+    if missing:
+        # Best-effort: the page already rendered in English, and a later page
+        # can queue these phrases again
+        try:
+            task_queue.enqueue('translate_phrases', {'phrases': sorted(missing)})
+        except Exception as e:
+            release_untranslated(missing)
+            print(f"Error queueing phrase translations: {e}")
+    return response
 
 @app.route('/')
 def index():
@@ -57,6 +108,12 @@ def worker_start():
     finally:
         db.close()
 
+def _page_args(default_size):
+    return request.args.get('cursor'), page_size(request.args.get('per_page', type=int), default_size)
+
+def _wants_json():
+    return request.args.get('format') == 'json'
+
 @app.route('/worker/dashboard')
 def worker_dashboard():
     if 'user_id' not in session or session.get('user_type') != 'worker':
@@ -68,20 +125,31 @@ def worker_dashboard():
         if not user:
             return redirect(url_for('index'))
         
-        applications = db.query(Application).filter_by(user_id=user.id).all()
+        cursor, limit = _page_args(Config.APPLICATIONS_PAGE_SIZE)
+        applications, next_cursor = worker_applications(db, user.id, cursor=cursor, limit=limit)
+        
+        if _wants_json():
+            return jsonify({
+                'items': [{
+                    'id': a.id,
+                    'status': a.status,
+                    'created_at': a.created_at.isoformat() if a.created_at else None,
+                    'job': job_profile(a.job) if a.job else None,
+                    'organization_name': a.job.organization.name if a.job and a.job.organization else None
+                } for a in applications],
+                'next_cursor': next_cursor
+            })
         
         applications_data = []
-        for app in applications:
-            job = db.query(Job).filter_by(id=app.job_id).first()
-            org = db.query(Organization).filter_by(id=job.organization_id).first() if job else None
-            
+        for application in applications:
             applications_data.append({
-                'application': app,
-                'job': job,
-                'organization': org
+                'application': application,
+                'job': application.job,
+                'organization': application.job.organization if application.job else None
             })
         
-        return render_template('worker/dashboard.html', user=user, applications=applications_data)
+        return render_template('worker/dashboard.html', user=user, applications=applications_data,
+                               cursor=cursor, next_cursor=next_cursor)
     finally:
         db.close()
 
@@ -100,6 +168,52 @@ def worker_chat():
     finally:
         db.close()
 
+def _chat_state(db, user_id):
+    state = db.query(ChatState).filter_by(user_id=user_id).first()
+    if not state:
+        state = ChatState(user_id=user_id, summarized_messages=0)
+        db.add(state)
+        db.flush()
+    return state
+
+def _record_chat_turn(db, user, assistant, chat_history, user_message, ai_response):
+    chat_history.append({"role": "user", "content": user_message})
+    chat_history.append({"role": "assistant", "content": ai_response})
+    
+    # The draft itself is updated by the update_chat_draft task; until it has
+    # merged these messages they stay pending and are never folded away. The
+    # increment is done in SQL so it cannot overwrite the task's decrement.
+    state = _chat_state(db, user.id)
+    state.pending_messages = func.coalesce(ChatState.pending_messages, 0) + 2
+    db.flush()
+    
+    is_complete = "COMPLETE" in ai_response
+    
+    kept = assistant.fold_history(chat_history, pending=state.pending_messages)
+    state.summarized_messages = (state.summarized_messages or 0) + len(chat_history) - len(kept)
+    user.chat_history = kept
+    
+    return is_complete
+
+def _enqueue_finalize(user_id):
+    # Runs after the chat turn is committed so the task sees the final draft
+    return task_queue.enqueue('finalize_resume', {'user_id': user_id}, user_id=user_id)
+
+def _enqueue_chat_turn_task(user_id, is_complete):
+    """After the turn is committed, queue either the draft update or, for the
+    last turn, finalize (which merges any pending messages itself)."""
+    if is_complete:
+        return _enqueue_finalize(user_id)
+    task_queue.enqueue('update_chat_draft', {'user_id': user_id}, user_id=user_id)
+    return None
+
+def _assistant_busy_message(language):
+    message = "The assistant is busy right now. Please try again in a moment."
+    return cached_translation(message, language) or message
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.route('/worker/chat/message', methods=['POST'])
 def worker_chat_message():
     if 'user_id' not in session:
@@ -115,40 +229,89 @@ def worker_chat_message():
             return jsonify({'error': 'User not found'}), 404
         
         chat_history = user.chat_history or []
+        state = _chat_state(db, user.id)
         
-        assistant = ResumeAssistant(language=user.language)
+        assistant = ResumeAssistant(language=user.language, summary=state.summary)
         ai_response = assistant.chat(user_message, chat_history)
+        if ai_response is None:
+            return jsonify({'error': _assistant_busy_message(user.language)}), 503
         
-        chat_history.append({"role": "user", "content": user_message})
-        chat_history.append({"role": "assistant", "content": ai_response})
-        
-        user.chat_history = chat_history
-        
-        is_complete = "COMPLETE" in ai_response
-        
-        if is_complete:
-            resume_data = assistant.extract_resume_data(chat_history)
-            
-            user.name = resume_data.get('name', user.name)
-            user.trade = resume_data.get('trade', user.trade)
-            user.experience_years = resume_data.get('experience_years', user.experience_years)
-            user.location = resume_data.get('location', user.location)
-            user.education = resume_data.get('education', user.education)
-            user.certifications = resume_data.get('certifications', user.certifications)
-            user.skills = resume_data.get('skills', [])
-            user.work_history = resume_data.get('work_history', [])
-            user.resume_complete = 1
+        is_complete = _record_chat_turn(db, user, assistant, chat_history, user_message, ai_response)
         
         db.commit()
         
         return jsonify({
             'response': ai_response,
-            'is_complete': is_complete
+            'is_complete': is_complete,
+            'task_id': _enqueue_chat_turn_task(user.id, is_complete)
         })
     
     finally:
         db.close()
 
+@app.route('/worker/chat/stream', methods=['POST'])
+def worker_chat_stream():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json()
+    user_message = sanitize_input(data.get('message', ''))
+    user_id = session['user_id']
+    
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter_by(id=user_id).first()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        language = user.language
+        chat_history = user.chat_history or []
+        summary = _chat_state(db, user.id).summary
+    finally:
+        db.close()
+    
+    assistant = ResumeAssistant(language=language, summary=summary)
+    
+    def generate():
+        started = time.perf_counter()
+        first_token_at = None
+        parts = []
+        
+        try:
+            for text in assistant.chat_stream(user_message, chat_history):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    metrics.record('chat_stream.ttft_ms', (first_token_at - started) * 1000)
+                parts.append(text)
+                yield _sse('token', {'text': text})
+        except Exception as e:
+            print(f"Error streaming chat response: {e}")
+            yield _sse('error', {'error': _assistant_busy_message(language)})
+            return
+        
+        ai_response = ''.join(parts) or "I'm here to help you build your resume."
+        
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter_by(id=user_id).first()
+            is_complete = _record_chat_turn(db, user, assistant, chat_history, user_message, ai_response)
+            db.commit()
+        finally:
+            db.close()
+        
+        total_ms = (time.perf_counter() - started) * 1000
+        metrics.record('chat_stream.total_ms', total_ms)
+        
+        yield _sse('done', {
+            'is_complete': is_complete,
+            'task_id': _enqueue_chat_turn_task(user_id, is_complete),
+            'ttft_ms': round((first_token_at - started) * 1000) if first_token_at else None,
+            'total_ms': round(total_ms)
+        })
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/worker/resume/preview')
 def worker_resume_preview():
     if 'user_id' not in session or session.get('user_type') != 'worker':
@@ -160,27 +323,12 @@ def worker_resume_preview():
         if not user or not user.resume_complete:
             return redirect(url_for('worker_chat'))
         
-        categorized_skills = extract_and_categorize_skills(user.skills, user.trade)
-        
-        user_data = {
-            'name': user.name,
-            'phone': user.phone,
-            'trade': user.trade,
-            'experience_years': user.experience_years,
-            'location': user.location,
-            'skills': user.skills,
-            'categorized_skills': categorized_skills,
-            'education': user.education,
-            'certifications': user.certifications,
-            'work_history': user.work_history
-        }
-        
-        resume_content = generate_ats_resume_content(user_data)
+        preview = run_pipeline(resume_preview_stages(user))
         
         return render_template('worker/resume_preview.html', 
                                user=user, 
-                               resume_content=resume_content,
-                               categorized_skills=categorized_skills)
+                               resume_content=preview['resume_content'],
+                               categorized_skills=preview['categorized_skills'])
     finally:
         db.close()
 
@@ -195,36 +343,59 @@ def worker_resume_download():
         if not user or not user.resume_complete:
             return jsonify({'error': 'Resume not ready'}), 400
         
-        categorized_skills = extract_and_categorize_skills(user.skills, user.trade)
-        
-        user_data = {
-            'name': user.name,
-            'phone': user.phone,
-            'trade': user.trade,
-            'experience_years': user.experience_years,
-            'location': user.location,
-            'skills': user.skills,
-            'categorized_skills': categorized_skills,
-            'education': user.education,
-            'certifications': user.certifications,
-            'work_history': user.work_history
-        }
-        
-        os.makedirs('static/resumes', exist_ok=True)
-        filename = f"resume_{user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        filepath = os.path.join('static/resumes', filename)
-        
-        # Generate PDF using WeasyPrint for pixel-perfect HTML-to-PDF conversion
-        success = generate_pdf_resume_from_html(user_data, categorized_skills, filepath)
-        
-        if success:
-            return send_file(filepath, as_attachment=True, download_name=f"{user.name}_Resume.pdf")
-        else:
-            return jsonify({'error': 'PDF generation failed'}), 500
+        # Unchanged resumes are already on disk; skip the render queue entirely
+        key = resume_pdf_source(user)[1]
+        if pdf_cache.cached_pdf(user.id, key):
+            return jsonify({'download_url': url_for('worker_resume_pdf', key=key)})
+        
+        task_id = task_queue.enqueue('resume_pdf', {'user_id': user.id}, user_id=user.id)
+        
+        return jsonify({
+            'task_id': task_id,
+            'status_url': url_for('task_status_view', task_id=task_id)
+        }), 202
     
     finally:
         db.close()
 
+@app.route('/worker/resume/pdf/<key>')
+def worker_resume_pdf(key):
+    if 'user_id' not in session or session.get('user_type') != 'worker':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # The key is the content hash, so it doubles as a strong ETag
+    if key in request.if_none_match:
+        return Response(status=304, headers={'ETag': f'"{key}"'})
+    
+    path = pdf_cache.cached_pdf(session['user_id'], key)
+    if not path:
+        return jsonify({'error': 'Not found'}), 404
+    
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter_by(id=session['user_id']).first()
+        download_name = f"{user.name}_Resume.pdf" if user else 'resume.pdf'
+    finally:
+        db.close()
+    
+    response = send_file(path, as_attachment=True, download_name=download_name, etag=key, conditional=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/tasks/<task_id>')
+def task_status_view(task_id):
+    record = task_queue.get_task(task_id)
+    if not record:
+        return jsonify({'error': 'Not found'}), 404
+    
+    owner_ok = (record.user_id is not None and record.user_id == session.get('user_id')) or \
+               (record.org_id is not None and record.org_id == session.get('org_id'))
+    if not owner_ok:
+        return jsonify({'error': 'Not found'}), 404
+    
+    return jsonify(task_queue.task_status(record))
+
 @app.route('/worker/jobs/recommended')
 def worker_jobs_recommended():
     if 'user_id' not in session or session.get('user_type') != 'worker':
@@ -236,41 +407,34 @@ def worker_jobs_recommended():
         if not user or not user.resume_complete:
             return redirect(url_for('worker_chat'))
         
-        jobs = db.query(Job).filter_by(status='active').all()
-        
-        jobs_data = []
-        for job in jobs:
-            org = db.query(Organization).filter_by(id=job.organization_id).first()
-            jobs_data.append({
-                'id': job.id,
-                'title': job.title,
-                'trade': job.trade,
-                'required_skills': job.required_skills,
-                'experience_required': job.experience_required,
-                'location': job.location,
-                'salary_min': job.salary_min,
-                'salary_max': job.salary_max,
-                'organization_name': org.name if org else 'Unknown'
-            })
-        
-        user_data = {
-            'trade': user.trade,
-            'experience_years': user.experience_years,
-            'skills': user.skills,
-            'location': user.location
-        }
-        
-        matched_jobs = match_jobs_for_user(user_data, jobs_data)
+        cursor, limit = _page_args(Config.MATCHES_PAGE_SIZE)
+        rows, next_cursor = get_user_matches(db, user.id, cursor=cursor, limit=limit)
         
         job_matches = []
-        for match in matched_jobs:
-            job = next((j for j in jobs_data if j['id'] == match['job_id']), None)
-            if job:
-                job['match_score'] = match['score']
-                job['match_reasoning'] = match['reasoning']
-                job_matches.append(job)
-        
-        return render_template('worker/jobs.html', jobs=job_matches, user=user)
+        for match, job, org_name in rows:
+            job_data = job_profile(job)
+            job_data['organization_name'] = org_name or 'Unknown'
+            job_data['match_score'] = match.score
+            job_data['match_reasoning'] = match.reasoning
+            job_matches.append(job_data)
+        
+        # Only the top of the first page is re-ranked; later pages keep the stored order
+        if Config.MATCH_LLM_RERANK and job_matches and not cursor:
+            top = job_matches[:Config.MATCH_RERANK_TOP_K]
+            reranked = rerank_with_llm(user_profile(user), top,
+                                       [{'job_id': j['id'], 'score': j['match_score'], 'reasoning': j['match_reasoning']}
+                                        for j in top])
+            jobs_by_id = {j['id']: j for j in top}
+            for match in reranked:
+                jobs_by_id[match['job_id']]['match_score'] = match['score']
+                jobs_by_id[match['job_id']]['match_reasoning'] = match['reasoning']
+            job_matches = [jobs_by_id[m['job_id']] for m in reranked] + job_matches[len(top):]
+        
+        if _wants_json():
+            return jsonify({'items': job_matches, 'next_cursor': next_cursor})
+        
+        return render_template('worker/jobs.html', jobs=job_matches, user=user,
+                               cursor=cursor, next_cursor=next_cursor)
     
     finally:
         db.close()
@@ -282,21 +446,21 @@ def worker_apply(job_id):
     
     db = SessionLocal()
     try:
-        existing = db.query(Application).filter_by(
-            user_id=session['user_id'],
-            job_id=job_id
-        ).first()
+        match = get_match(db, session['user_id'], job_id)
         
-        if existing:
-            return jsonify({'error': 'Already applied to this job'}), 400
-        
-        application = Application(
+        inserted = insert_application(
+            db,
             user_id=session['user_id'],
             job_id=job_id,
+            match_score=match.score if match else None,
+            match_reasoning=match.reasoning if match else None,
             status='pending'
         )
         
-        db.add(application)
+        if not inserted:
+            db.rollback()
+            return jsonify({'error': 'Already applied to this job'}), 400
+        
         db.commit()
         
         return jsonify({'success': True, 'message': 'Application submitted successfully'})
@@ -334,10 +498,16 @@ def worker_account_update():
         
         if 'name' in data and data['name']:
             user.name = sanitize_input(data['name'])
+        profile_changed = False
         if 'location' in data and data['location']:
             user.location = sanitize_input(data['location'])
+            profile_changed = True
         if 'trade' in data and data['trade']:
             user.trade = sanitize_input(data['trade'])
+            profile_changed = True
+        
+        if profile_changed:
+            refresh_user_matches(db, user)
         
         db.commit()
         
@@ -383,11 +553,8 @@ def employer_dashboard():
         if not org:
             return redirect(url_for('index'))
         
-        jobs = db.query(Job).filter_by(organization_id=org.id).all()
-        
         jobs_data = []
-        for job in jobs:
-            app_count = db.query(Application).filter_by(job_id=job.id).count()
+        for job, app_count in organization_jobs_with_counts(db, org.id):
             jobs_data.append({
                 'job': job,
                 'application_count': app_count
@@ -432,6 +599,8 @@ def employer_post_job():
         )
         
         db.add(job)
+        db.flush()
+        refresh_job_matches(db, job)
         db.commit()
         
         return jsonify({'success': True, 'message': 'Job posted successfully'})
@@ -450,39 +619,21 @@ def employer_matches(job_id):
         if not job:
             return jsonify({'error': 'Job not found'}), 404
         
-        users = db.query(User).filter_by(resume_complete=1).all()
-        
-        users_data = []
-        for user in users:
-            users_data.append({
-                'id': user.id,
-                'name': user.name,
-                'trade': user.trade,
-                'experience_years': user.experience_years,
-                'skills': user.skills,
-                'location': user.location
-            })
-        
-        job_data = [{
-            'id': job.id,
-            'title': job.title,
-            'trade': job.trade,
-            'required_skills': job.required_skills,
-            'experience_required': job.experience_required,
-            'location': job.location
-        }]
+        cursor, limit = _page_args(Config.MATCHES_PAGE_SIZE)
+        rows, next_cursor = get_job_matches(db, job.id, cursor=cursor, limit=limit)
         
         matches = []
-        for user_data in users_data:
-            match_result = match_jobs_for_user(user_data, job_data)
-            if match_result:
-                user_data['match_score'] = match_result[0]['score']
-                user_data['match_reasoning'] = match_result[0]['reasoning']
-                matches.append(user_data)
+        for match, user in rows:
+            user_data = user_profile(user)
+            user_data['match_score'] = match.score
+            user_data['match_reasoning'] = match.reasoning
+            matches.append(user_data)
         
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
+        if _wants_json():
+            return jsonify({'items': matches, 'next_cursor': next_cursor})
         
-        return render_template('employer/matches.html', job=job, matches=matches)
+        return render_template('employer/matches.html', job=job, matches=matches,
+                               cursor=cursor, next_cursor=next_cursor)
     
     finally:
         db.close()
@@ -498,21 +649,75 @@ def employer_applicants(job_id):
         if not job:
             return jsonify({'error': 'Job not found'}), 404
         
-        applications = db.query(Application).filter_by(job_id=job_id).all()
+        cursor, limit = _page_args(Config.APPLICATIONS_PAGE_SIZE)
+        applications, next_cursor = job_applicants(db, job_id, cursor=cursor, limit=limit)
+        overlap = applicant_skill_overlap(db, job_id, [a.user_id for a in applications])
         
         applicants_data = []
-        for app in applications:
-            user = db.query(User).filter_by(id=app.user_id).first()
-            if user:
+        for application in applications:
+            if application.user:
                 applicants_data.append({
-                    'application': app,
-                    'user': user
+                    'application': application,
+                    'user': application.user,
+                    'shared_skills': overlap.get(application.user_id, 0)
                 })
         
-        return render_template('employer/applicants.html', job=job, applicants=applicants_data)
+        if _wants_json():
+            return jsonify({
+                'items': [{
+                    'id': a['application'].id,
+                    'status': a['application'].status,
+                    'created_at': a['application'].created_at.isoformat() if a['application'].created_at else None,
+                    'match_score': a['application'].match_score,
+                    'shared_skills': a['shared_skills'],
+                    'user': user_profile(a['user'])
+                } for a in applicants_data],
+                'next_cursor': next_cursor
+            })
+        
+        return render_template('employer/applicants.html', job=job, applicants=applicants_data,
+                               total_applicants=count_job_applicants(db, job_id),
+                               cursor=cursor, next_cursor=next_cursor)
+    
+    finally:
+        db.close()
+
+@app.route('/employer/export')
+def employer_export_resumes():
+    if 'org_id' not in session or session.get('user_type') != 'employer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    job_id = request.args.get('job_id', type=int)
+    application_ids = None
+    if request.args.get('application_ids'):
+        try:
+            application_ids = [int(i) for i in request.args['application_ids'].split(',') if i.strip()]
+        except ValueError:
+            return jsonify({'error': 'Invalid application ids'}), 400
+    if job_id is None and not application_ids:
+        return jsonify({'error': 'Provide job_id or application_ids'}), 400
     
+    db = SessionLocal()
+    try:
+        users = export_candidates(db, session['org_id'], job_id=job_id, application_ids=application_ids,
+                                  limit=Config.BULK_EXPORT_MAX_RESUMES)
     finally:
         db.close()
+    
+    if not users:
+        return jsonify({'error': 'No resumes to export'}), 404
+    
+    # Wait for the first rendered resume before committing to a 200
+    chunks = stream_resume_zip(app, users)
+    try:
+        first = next(chunks)
+    except NothingExportedError as e:
+        print(f"Error exporting resumes: {e}")
+        return jsonify({'error': 'The resumes could not be generated right now. Please try again.'}), 503
+    
+    filename = f"resumes_job_{job_id}.zip" if job_id is not None else 'resumes.zip'
+    return Response(itertools.chain([first], chunks), mimetype='application/zip',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
 
 @app.route('/employer/application/update/<int:application_id>', methods=['POST'])
 def employer_update_application(application_id):
@@ -527,11 +732,11 @@ def employer_update_application(application_id):
     
     db = SessionLocal()
     try:
-        application = db.query(Application).filter_by(id=application_id).first()
+        application = application_with_job(db, application_id)
         if not application:
             return jsonify({'error': 'Application not found'}), 404
         
-        job = db.query(Job).filter_by(id=application.job_id).first()
+        job = application.job
         if not job or job.organization_id != session['org_id']:
             return jsonify({'error': 'Unauthorized'}), 403
         
@@ -588,6 +793,11 @@ def employer_account_update():
     finally:
         db.close()
 
+@app.route('/metrics/llm')
+def llm_metrics():
+    return jsonify({'cache': cache_stats(), 'coalescing': coalescing_stats(), 'gemini': resilience_stats(),
+                    'latency': metrics.snapshot(), 'pdf': pdf_renderer.stats(), 'routing': router_stats()})
+
 @app.route('/logout')
 def logout():
     session.clear()
@@ -14,9 +14,86 @@ class Config:
         import secrets
         SECRET_KEY = secrets.token_hex(32)
     GEMINI_API_KEY = _clean_env_value(os.environ.get('GEMINI_API_KEY') or os.environ.get('GOOGLE_API_KEY'))
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///skilllink.db'
+    SQLALCHEMY_DATABASE_URI = _clean_env_value(os.environ.get('DATABASE_URL')) or 'sqlite:///skilllink.db'
+    if SQLALCHEMY_DATABASE_URI.startswith('postgres://'):
+        SQLALCHEMY_DATABASE_URI = 'postgresql://' + SQLALCHEMY_DATABASE_URI[len('postgres://'):]
+    SQLALCHEMY_ECHO = _clean_env_value(os.environ.get('SQLALCHEMY_ECHO')) in ('1', 'true', 'yes')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     PERMANENT_SESSION_LIFETIME = 86400
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+    # Job matching is scored locally; Gemini only re-ranks the top candidates when enabled
+    MATCH_LLM_RERANK = _clean_env_value(os.environ.get('MATCH_LLM_RERANK')) in ('1', 'true', 'yes')
+    MATCH_RERANK_TOP_K = int(_clean_env_value(os.environ.get('MATCH_RERANK_TOP_K')) or 20)
+    MATCHES_PAGE_SIZE = int(_clean_env_value(os.environ.get('MATCHES_PAGE_SIZE')) or 20)
+    # List pages (models/pagination.py); ?per_page= is clamped to PAGE_SIZE_MAX
+    PAGE_SIZE_DEFAULT = int(_clean_env_value(os.environ.get('PAGE_SIZE_DEFAULT')) or 20)
+    APPLICATIONS_PAGE_SIZE = int(_clean_env_value(os.environ.get('APPLICATIONS_PAGE_SIZE')) or 25)
+    PAGE_SIZE_MAX = int(_clean_env_value(os.environ.get('PAGE_SIZE_MAX')) or 100)
+    # Shared Gemini client (utils/llm_gateway.py)
+    LLM_TIMEOUT_SECONDS = float(_clean_env_value(os.environ.get('LLM_TIMEOUT_SECONDS')) or 60)
+    LLM_MAX_CONNECTIONS = int(_clean_env_value(os.environ.get('LLM_MAX_CONNECTIONS')) or 20)
+    LLM_MAX_KEEPALIVE_CONNECTIONS = int(_clean_env_value(os.environ.get('LLM_MAX_KEEPALIVE_CONNECTIONS')) or 10)
+    LLM_KEEPALIVE_EXPIRY_SECONDS = float(_clean_env_value(os.environ.get('LLM_KEEPALIVE_EXPIRY_SECONDS')) or 120)
+    LLM_MODEL_CONCURRENCY = {'gemini-2.5-pro': 4, 'gemini-2.5-flash': 8}
+    LLM_DEFAULT_CONCURRENCY = 8
+    LLM_SLOT_WAIT_SECONDS = float(_clean_env_value(os.environ.get('LLM_SLOT_WAIT_SECONDS')) or 30)
+    # Model routing (utils/model_router.py): a task's preferred model is skipped
+    # when its recent p95 latency exceeds the caller's budget or its error rate this threshold
+    LLM_FALLBACK_ERROR_RATE = float(_clean_env_value(os.environ.get('LLM_FALLBACK_ERROR_RATE')) or 0.25)
+    LLM_HEALTH_WINDOW_SECONDS = int(_clean_env_value(os.environ.get('LLM_HEALTH_WINDOW_SECONDS')) or 300)
+    LLM_HEALTH_MIN_SAMPLES = int(_clean_env_value(os.environ.get('LLM_HEALTH_MIN_SAMPLES')) or 10)
+    # A call, with its retries and fallback, is abandoned after this many times its latency budget
+    LLM_DEADLINE_BUDGET_FACTOR = float(_clean_env_value(os.environ.get('LLM_DEADLINE_BUDGET_FACTOR')) or 3)
+    # USD per million (input, output) tokens, for per-task cost accounting
+    LLM_PRICE_PER_MILLION_TOKENS = {'gemini-2.5-pro': (1.25, 10.0), 'gemini-2.5-flash': (0.30, 2.50)}
+    # Client-side throttling, retries and circuit breaking (utils/llm_resilience.py)
+    LLM_RATE_PER_MINUTE = {'gemini-2.5-pro': 60, 'gemini-2.5-flash': 300}
+    LLM_DEFAULT_RATE_PER_MINUTE = 120
+    LLM_RATE_BURST = int(_clean_env_value(os.environ.get('LLM_RATE_BURST')) or 10)
+    LLM_MAX_RETRIES = int(_clean_env_value(os.environ.get('LLM_MAX_RETRIES')) or 3)
+    LLM_BACKOFF_BASE_SECONDS = float(_clean_env_value(os.environ.get('LLM_BACKOFF_BASE_SECONDS')) or 0.5)
+    LLM_BACKOFF_MAX_SECONDS = float(_clean_env_value(os.environ.get('LLM_BACKOFF_MAX_SECONDS')) or 8)
+    LLM_RETRY_AFTER_MAX_SECONDS = float(_clean_env_value(os.environ.get('LLM_RETRY_AFTER_MAX_SECONDS')) or 30)
+    LLM_BREAKER_FAILURES = int(_clean_env_value(os.environ.get('LLM_BREAKER_FAILURES')) or 5)
+    LLM_BREAKER_COOLDOWN_SECONDS = float(_clean_env_value(os.environ.get('LLM_BREAKER_COOLDOWN_SECONDS')) or 30)
+    # Response cache; set LLM_CACHE_DB_PATH to an empty string to keep it in memory only
+    LLM_CACHE_MAX_ENTRIES = int(_clean_env_value(os.environ.get('LLM_CACHE_MAX_ENTRIES')) or 512)
+    LLM_CACHE_DB_PATH = _clean_env_value(os.environ.get('LLM_CACHE_DB_PATH', 'llm_cache.db'))
+    LLM_CACHE_TTL_SKILLS = 7 * 86400
+    LLM_CACHE_TTL_RESUME = 86400
+    LLM_CACHE_TTL_RERANK = 6 * 3600
+    # Resume chat keeps this many recent exchanges verbatim; older ones are summarized
+    CHAT_CONTEXT_TURNS = int(_clean_env_value(os.environ.get('CHAT_CONTEXT_TURNS')) or 6)
+    CHAT_PROMPT_TOKEN_BUDGET = int(_clean_env_value(os.environ.get('CHAT_PROMPT_TOKEN_BUDGET')) or 6000)
+    # Background tasks (utils/task_queue.py)
+    TASK_WORKERS = int(_clean_env_value(os.environ.get('TASK_WORKERS')) or 2)
+    TASK_STALE_SECONDS = int(_clean_env_value(os.environ.get('TASK_STALE_SECONDS')) or 600)
+    # Threads for independent AI stages (utils/ai_pipeline.py)
+    AI_PIPELINE_WORKERS = int(_clean_env_value(os.environ.get('AI_PIPELINE_WORKERS')) or 4)
+    # Rendered resume PDFs, keyed by content hash (utils/pdf_cache.py)
+    PDF_CACHE_DIR = _clean_env_value(os.environ.get('PDF_CACHE_DIR')) or 'resume_cache'
+    PDF_CACHE_MAX_BYTES = int(_clean_env_value(os.environ.get('PDF_CACHE_MAX_BYTES')) or 200 * 1024 * 1024)
+    PDF_CACHE_MAX_AGE_SECONDS = int(_clean_env_value(os.environ.get('PDF_CACHE_MAX_AGE_SECONDS')) or 30 * 86400)
+    # WeasyPrint render processes (utils/pdf_renderer.py); 0 renders in-process
+    PDF_RENDER_WORKERS = int(_clean_env_value(os.environ.get('PDF_RENDER_WORKERS')) or 2)
+    PDF_RENDER_QUEUE_SIZE = int(_clean_env_value(os.environ.get('PDF_RENDER_QUEUE_SIZE')) or 16)
+    PDF_RENDER_WAIT_SECONDS = float(_clean_env_value(os.environ.get('PDF_RENDER_WAIT_SECONDS')) or 10)
+    PDF_RENDER_TIMEOUT_SECONDS = float(_clean_env_value(os.environ.get('PDF_RENDER_TIMEOUT_SECONDS')) or 60)
+    # Translation memory (utils/translator.py)
+    TRANSLATION_MEMORY_MAX_ENTRIES = int(_clean_env_value(os.environ.get('TRANSLATION_MEMORY_MAX_ENTRIES')) or 5000)
+    # Employer bulk resume export (utils/bulk_export.py)
+    BULK_EXPORT_WORKERS = int(_clean_env_value(os.environ.get('BULK_EXPORT_WORKERS')) or 4)
+    BULK_EXPORT_MAX_RESUMES = int(_clean_env_value(os.environ.get('BULK_EXPORT_MAX_RESUMES')) or 200)
+    # Connection pool for server databases (ignored for SQLite's own pooling)
+    DB_POOL_SIZE = int(_clean_env_value(os.environ.get('DB_POOL_SIZE')) or 5)
+    DB_MAX_OVERFLOW = int(_clean_env_value(os.environ.get('DB_MAX_OVERFLOW')) or 10)
+    DB_POOL_TIMEOUT = int(_clean_env_value(os.environ.get('DB_POOL_TIMEOUT')) or 30)
+    DB_POOL_RECYCLE = int(_clean_env_value(os.environ.get('DB_POOL_RECYCLE')) or 1800)
+    # SQLite pragmas applied on every new connection
+    SQLITE_JOURNAL_MODE = _clean_env_value(os.environ.get('SQLITE_JOURNAL_MODE')) or 'WAL'
+    SQLITE_SYNCHRONOUS = _clean_env_value(os.environ.get('SQLITE_SYNCHRONOUS')) or 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = int(_clean_env_value(os.environ.get('SQLITE_BUSY_TIMEOUT_MS')) or 5000)
+    SQLITE_MMAP_SIZE = int(_clean_env_value(os.environ.get('SQLITE_MMAP_SIZE')) or 256 * 1024 * 1024)
+    SQLITE_CACHE_SIZE_KB = int(_clean_env_value(os.environ.get('SQLITE_CACHE_SIZE_KB')) or 64 * 1024)
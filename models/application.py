@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text, Index
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from models.database import Base
 
@@ -13,3 +14,12 @@ class Application(Base):
     status = Column(String(20), default='pending')
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    user = relationship('User', back_populates='applications')
+    job = relationship('Job', back_populates='applications')
+    
+    __table_args__ = (
+        Index('uq_applications_user_job', 'user_id', 'job_id', unique=True),
+        Index('ix_applications_user_created', 'user_id', 'created_at'),
+        Index('ix_applications_job_created', 'job_id', 'created_at'),
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from datetime import datetime
+from models.database import Base
+import json
+
+class ChatState(Base):
+    __tablename__ = 'chat_states'
+    
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    summary_json = Column(Text)
+    summarized_messages = Column(Integer, default=0)
+    pending_messages = Column(Integer, default=0)
+    # Bumped by every draft update; updates compare-and-set on it (utils/tasks.py)
+    draft_version = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @property
+    def summary(self):
+        if self.summary_json:
+            return json.loads(self.summary_json)
+        return {}
+    
+    @summary.setter
+    def summary(self, value):
+        self.summary_json = json.dumps(value)
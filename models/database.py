@@ -1,17 +1,90 @@
-from sqlalchemy import create_engine
+import fcntl
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
+from config import Config
 
-engine = create_engine('sqlite:///skilllink.db', echo=False)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers proceed while one writer commits; busy_timeout makes
+        # concurrent writers wait instead of failing with "database is locked".
+        cursor.execute(f"PRAGMA journal_mode={Config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA busy_timeout={Config.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={Config.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{Config.SQLITE_CACHE_SIZE_KB}")
+    finally:
+        cursor.close()
+
+
+def make_engine(uri=None):
+    uri = uri or Config.SQLALCHEMY_DATABASE_URI
+    if uri.startswith('sqlite'):
+        engine = create_engine(
+            uri,
+            echo=Config.SQLALCHEMY_ECHO,
+            connect_args={'timeout': Config.SQLITE_BUSY_TIMEOUT_MS / 1000, 'check_same_thread': False}
+        )
+        event.listen(engine, 'connect', _apply_sqlite_pragmas)
+        return engine
+
+    return create_engine(
+        uri,
+        echo=Config.SQLALCHEMY_ECHO,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+
+
+engine = make_engine()
 SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 Base = declarative_base()
 
+# Arbitrary constant identifying this app's advisory lock on PostgreSQL
+SCHEMA_LOCK_KEY = 7261
+
+@contextmanager
+def schema_lock():
+    """Serialize schema setup between processes. Every gunicorn worker imports
+    the app and runs init_db() and the startup backfills; without this, two
+    workers booting together race on CREATE TABLE and the migrations.
+    PostgreSQL uses an advisory lock, SQLite a lock file next to the database."""
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {'key': SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': SCHEMA_LOCK_KEY})
+    elif engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:'):
+        with open(engine.url.database + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        yield
+
 def init_db():
     import models.user
     import models.organization
     import models.job
     import models.application
+    import models.match_score
+    import models.chat_state
+    import models.task
+    import models.skill
+    import models.translation
+    import models.migrations
     Base.metadata.create_all(bind=engine)
+    models.migrations.run_migrations(engine)
 
 def get_db():
     db = SessionLocal()
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index, func
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from models.database import Base
 import json
@@ -20,10 +21,24 @@ class Job(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    organization = relationship('Organization', back_populates='jobs')
+    applications = relationship('Application', back_populates='job')
+    skill_links = relationship('JobSkill', back_populates='job', cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        Index('ix_jobs_organization_created', 'organization_id', 'created_at'),
+        Index('ix_jobs_status', 'status'),
+        Index('ix_jobs_trade_lower', func.lower(trade)),
+    )
+    
     @property
     def required_skills(self):
         if self.required_skills_json:
-            return json.loads(self.required_skills_json)
+            cached = self.__dict__.get('_skills_cache')
+            if cached is None or cached[0] is not self.required_skills_json:
+                cached = (self.required_skills_json, json.loads(self.required_skills_json))
+                self.__dict__['_skills_cache'] = cached
+            return list(cached[1])
         return []
     
     @required_skills.setter
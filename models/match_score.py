@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, Text, Index, UniqueConstraint
+from datetime import datetime
+from models.database import Base
+
+class MatchScore(Base):
+    __tablename__ = 'match_scores'
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
+    score = Column(Float, nullable=False)
+    reasoning = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('user_id', 'job_id', name='uq_match_scores_user_job'),
+        Index('ix_match_scores_user_score', 'user_id', 'score'),
+        Index('ix_match_scores_job_score', 'job_id', 'score'),
+    )
@@ -0,0 +1,103 @@
+from sqlalchemy import Column, Integer, String, DateTime, text, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
+from datetime import datetime
+from models.database import Base
+
+# Data and schema changes that create_all() can't express. Each runs once per
+# database, in order, and is recorded in schema_migrations.
+MIGRATIONS = []
+
+
+class SchemaMigration(Base):
+    __tablename__ = 'schema_migrations'
+    
+    version = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+def migration(version, name):
+    def decorator(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return decorator
+
+
+def run_migrations(engine):
+    session = sessionmaker(bind=engine)()
+    try:
+        applied = {v for (v,) in session.query(SchemaMigration.version)}
+        for version, name, fn in MIGRATIONS:
+            if version in applied:
+                continue
+            fn(session)
+            session.add(SchemaMigration(version=version, name=name))
+            session.commit()
+            print(f"Applied migration {version}: {name}")
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _create_indexes(session, *tables):
+    # IF NOT EXISTS rather than checkfirst, whose inspector skips expression
+    # indexes on SQLite
+    for table in tables:
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            session.execute(CreateIndex(index, if_not_exists=True))
+
+
+@migration(1, 'backfill_skill_links')
+def backfill_skill_links(session):
+    from models.user import User
+    from models.job import Job
+    from models.skill import sync_skill_links
+
+    pending = {}
+    for user in session.query(User).filter(User.skills_json.isnot(None)):
+        sync_skill_links(session, user, user.skills, pending)
+    for job in session.query(Job).filter(Job.required_skills_json.isnot(None)):
+        sync_skill_links(session, job, job.required_skills, pending)
+    session.flush()
+
+
+@migration(2, 'hot_filter_indexes')
+def hot_filter_indexes(session):
+    from models.user import User
+    from models.job import Job
+    from models.application import Application
+
+    # Older databases may already hold duplicate applications from the
+    # check-then-insert race; keep the earliest before enforcing uniqueness.
+    session.execute(text(
+        "DELETE FROM applications WHERE id NOT IN "
+        "(SELECT MIN(id) FROM applications GROUP BY user_id, job_id)"
+    ))
+    _create_indexes(session, User.__table__, Job.__table__, Application.__table__)
+
+
+@migration(3, 'chat_state_draft_version')
+def chat_state_draft_version(session):
+    # chat_states tables created before draft_version existed
+    columns = {c['name'] for c in inspect(session.connection()).get_columns('chat_states')}
+    if 'draft_version' not in columns:
+        session.execute(text("ALTER TABLE chat_states ADD COLUMN draft_version INTEGER DEFAULT 0"))
+
+
+@migration(4, 'skill_words_replace_token_index')
+def skill_words_replace_token_index(session):
+    from models.user import User
+    from models.job import Job
+    from models.skill import Skill, insert_skill_words
+
+    # Candidate retrieval now joins user_skills/job_skills through skill_words
+    # and matches trades on lower(trade); the per-row token table is gone
+    skills = session.query(Skill).order_by(Skill.id).all()
+    for start in range(0, len(skills), 500):
+        insert_skill_words(session, skills[start:start + 500])
+    _create_indexes(session, User.__table__, Job.__table__)
+    session.execute(text("DROP TABLE IF EXISTS skill_index"))
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+from config import Config
+
+
+def page_size(requested=None, default=None):
+    size = requested or default or Config.PAGE_SIZE_DEFAULT
+    return max(1, min(size, Config.PAGE_SIZE_MAX))
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Cursor values coerced to the column types, or None if the cursor is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            return None
+        return [
+            datetime.fromisoformat(v) if v is not None and col.type.python_type is datetime else v
+            for col, v in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        return None
+
+
+def _after(order, values):
+    # (a, b) after (va, vb) in "a desc, b asc" order: a < va OR (a = va AND b > vb)
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        equal = [c == v for (c, _), v in zip(order[:i], values[:i])]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def keyset_page(query, order, key, cursor=None, limit=None):
+    """One page of query rows after cursor, using a keyset seek instead of OFFSET.
+
+    order is a list of (column, descending) pairs ending in a unique column;
+    key(row) returns those column values for a row. Returns (rows, next_cursor),
+    with next_cursor None on the last page.
+    """
+    limit = page_size(limit)
+    values = decode_cursor(cursor, [column for column, _ in order])
+    if values is not None:
+        query = query.filter(_after(order, values))
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order])
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(key(rows[limit - 1]))
+    return rows, None
@@ -0,0 +1,121 @@
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from models.application import Application
+from models.job import Job
+from models.user import User
+from models.skill import UserSkill, JobSkill
+from models.pagination import keyset_page
+
+
+NEWEST_FIRST = [(Application.created_at, True), (Application.id, True)]
+
+
+def _newest_key(application):
+    return (application.created_at, application.id)
+
+
+def worker_applications(db, user_id, cursor=None, limit=None):
+    """Page of a worker's applications, newest first, with their job and
+    organization in one query. Returns (applications, next_cursor)."""
+    query = (
+        db.query(Application)
+        .options(joinedload(Application.job).joinedload(Job.organization))
+        .filter(Application.user_id == user_id)
+    )
+    return keyset_page(query, NEWEST_FIRST, key=_newest_key, cursor=cursor, limit=limit)
+
+
+def organization_jobs_with_counts(db, org_id):
+    """(job, application_count) pairs for an employer, counted with one GROUP BY."""
+    counts = (
+        db.query(Application.job_id, func.count(Application.id).label('application_count'))
+        .group_by(Application.job_id)
+        .subquery()
+    )
+    return (
+        db.query(Job, func.coalesce(counts.c.application_count, 0))
+        .outerjoin(counts, counts.c.job_id == Job.id)
+        .filter(Job.organization_id == org_id)
+        .order_by(Job.created_at.desc())
+        .all()
+    )
+
+
+def job_applicants(db, job_id, cursor=None, limit=None):
+    """Page of applications for a job, newest first, with their applicants
+    loaded in one extra query. Returns (applications, next_cursor)."""
+    query = (
+        db.query(Application)
+        .options(selectinload(Application.user))
+        .filter(Application.job_id == job_id)
+    )
+    return keyset_page(query, NEWEST_FIRST, key=_newest_key, cursor=cursor, limit=limit)
+
+
+def count_job_applicants(db, job_id):
+    return db.query(func.count(Application.id)).filter(Application.job_id == job_id).scalar()
+
+
+def application_with_job(db, application_id):
+    return (
+        db.query(Application)
+        .options(joinedload(Application.job))
+        .filter(Application.id == application_id)
+        .first()
+    )
+
+
+def applicant_skill_overlap(db, job_id, user_ids):
+    """{user_id: shared required skills} for the given applicants, counted in SQL."""
+    if not user_ids:
+        return {}
+    rows = (
+        db.query(UserSkill.user_id, func.count(UserSkill.skill_id))
+        .join(JobSkill, JobSkill.skill_id == UserSkill.skill_id)
+        .filter(JobSkill.job_id == job_id, UserSkill.user_id.in_(user_ids))
+        .group_by(UserSkill.user_id)
+        .all()
+    )
+    return dict(rows)
+
+
+def export_candidates(db, org_id, job_id=None, application_ids=None, limit=None):
+    """Distinct workers with finished resumes behind an employer's applications,
+    selected by job or by application ids."""
+    query = (
+        db.query(User)
+        .join(Application, Application.user_id == User.id)
+        .join(Job, Job.id == Application.job_id)
+        .filter(Job.organization_id == org_id, User.resume_complete == 1)
+    )
+    if job_id is not None:
+        query = query.filter(Application.job_id == job_id)
+    if application_ids is not None:
+        query = query.filter(Application.id.in_(application_ids))
+    return query.distinct().order_by(User.id).limit(limit).all()
+
+
+def insert_application(db, **values):
+    """Insert an application unless (user_id, job_id) already exists.
+
+    Relies on the unique index so concurrent requests can't both insert.
+    Returns True if a row was written.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(Application).values(**values).on_conflict_do_nothing(
+            index_elements=['user_id', 'job_id']
+        )
+        return db.execute(stmt).rowcount == 1
+
+    try:
+        with db.begin_nested():
+            db.add(Application(**values))
+        return True
+    except IntegrityError:
+        return False
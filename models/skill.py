@@ -0,0 +1,155 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, event, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import relationship, Session
+from models.database import Base
+import re
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# Words that appear in many skill names and would make every row a candidate
+_STOPWORDS = {'and', 'or', 'of', 'the', 'a', 'an', 'in', 'on', 'for', 'with', 'to', 'work', 'works', 'general'}
+
+
+def skill_key(name):
+    """Normalized form used to deduplicate skills ("Pipe-Fitting " -> "pipe fitting")."""
+    return ' '.join(_WORD_RE.findall(str(name or '').lower()))
+
+
+def skill_words(name):
+    """Words of a skill (or trade) that candidate retrieval matches on."""
+    return {w for w in _WORD_RE.findall(str(name or '').lower()) if w not in _STOPWORDS and len(w) > 1}
+
+
+class Skill(Base):
+    __tablename__ = 'skills'
+    
+    id = Column(Integer, primary_key=True)
+    key = Column(String(100), unique=True, nullable=False)
+    name = Column(String(100), nullable=False)
+
+
+class SkillWord(Base):
+    __tablename__ = 'skill_words'
+    
+    skill_id = Column(Integer, ForeignKey('skills.id'), primary_key=True)
+    word = Column(String(100), primary_key=True)
+    
+    __table_args__ = (
+        Index('ix_skill_words_word', 'word', 'skill_id'),
+    )
+
+
+class UserSkill(Base):
+    __tablename__ = 'user_skills'
+    
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    skill_id = Column(Integer, ForeignKey('skills.id'), primary_key=True)
+    
+    user = relationship('User', back_populates='skill_links')
+    skill = relationship('Skill')
+    
+    __table_args__ = (
+        Index('ix_user_skills_skill', 'skill_id', 'user_id'),
+    )
+
+
+class JobSkill(Base):
+    __tablename__ = 'job_skills'
+    
+    job_id = Column(Integer, ForeignKey('jobs.id'), primary_key=True)
+    skill_id = Column(Integer, ForeignKey('skills.id'), primary_key=True)
+    
+    job = relationship('Job', back_populates='skill_links')
+    skill = relationship('Skill')
+    
+    __table_args__ = (
+        Index('ix_job_skills_skill', 'skill_id', 'job_id'),
+    )
+
+
+def _skills_by_key(session, names, pending):
+    """Skill rows for the given names, creating missing ones in this session."""
+    wanted = {}
+    for name in names:
+        key = skill_key(name)
+        if key and key not in wanted:
+            wanted[key] = name
+
+    missing = [k for k in wanted if k not in pending]
+    if missing:
+        with session.no_autoflush:
+            _insert_ignoring_conflicts(session, Skill, [{'key': k, 'name': wanted[k].strip()} for k in missing])
+            skills = session.query(Skill).filter(Skill.key.in_(missing)).all()
+            insert_skill_words(session, skills)
+            for skill in skills:
+                pending[skill.key] = skill
+    return [pending[k] for k in wanted if k in pending]
+
+
+def insert_skill_words(session, skills):
+    rows = [{'skill_id': skill.id, 'word': word} for skill in skills for word in sorted(skill_words(skill.key))]
+    if rows:
+        _insert_ignoring_conflicts(session, SkillWord, rows)
+
+
+def _insert_ignoring_conflicts(session, model, rows):
+    """Insert rows, skipping ones whose key already exists (including ones a
+    concurrent transaction just added), like insert_application."""
+    dialect = session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        session.execute(insert(model).values(rows).on_conflict_do_nothing())
+        return
+
+    # Savepoints on the connection, since Session.begin_nested() would flush from inside before_flush
+    connection = session.connection()
+    for row in rows:
+        try:
+            with connection.begin_nested():
+                connection.execute(model.__table__.insert().values(**row))
+        except IntegrityError:
+            pass
+
+
+def linked_skill_names(session, link_class, owner_ids):
+    """{owner id: [skill names]} for UserSkill or JobSkill links, read from
+    the normalized tables rather than the JSON columns."""
+    owner_column = link_class.user_id if link_class is UserSkill else link_class.job_id
+    names = {owner_id: [] for owner_id in owner_ids}
+    ids = list(names)
+    # In chunks, to stay under SQLite's bound-parameter limit
+    for start in range(0, len(ids), 500):
+        rows = (
+            session.query(owner_column, Skill.name)
+            .join(Skill, Skill.id == link_class.skill_id)
+            .filter(owner_column.in_(ids[start:start + 500]))
+        )
+        for owner_id, name in rows:
+            names[owner_id].append(name)
+    return names
+
+
+def sync_skill_links(session, owner, names, pending=None):
+    link_class = UserSkill if owner.__tablename__ == 'users' else JobSkill
+    skills = _skills_by_key(session, names, {} if pending is None else pending)
+    owner.skill_links = [link_class(skill=skill) for skill in skills]
+
+
+@event.listens_for(Session, 'before_flush')
+def _sync_changed_skills(session, flush_context, instances):
+    """Keep user_skills/job_skills in step with the skills JSON columns."""
+    pending = {}
+    for obj in list(session.new) + list(session.dirty):
+        tablename = getattr(obj, '__tablename__', None)
+        if tablename == 'users':
+            column, names = 'skills_json', obj.skills
+        elif tablename == 'jobs':
+            column, names = 'required_skills_json', obj.required_skills
+        else:
+            continue
+        if obj in session.new or inspect(obj).attrs[column].history.has_changes():
+            sync_skill_links(session, obj, names, pending)
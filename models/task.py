@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from models.database import Base
+import json
+
+class BackgroundTask(Base):
+    __tablename__ = 'background_tasks'
+    
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    user_id = Column(Integer)
+    org_id = Column(Integer)
+    status = Column(String(20), default='queued')
+    payload_json = Column(Text)
+    result_json = Column(Text)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('ix_background_tasks_status', 'status'),
+    )
+    
+    @property
+    def payload(self):
+        if self.payload_json:
+            return json.loads(self.payload_json)
+        return {}
+    
+    @payload.setter
+    def payload(self, value):
+        self.payload_json = json.dumps(value)
+    
+    @property
+    def result(self):
+        if self.result_json:
+            return json.loads(self.result_json)
+        return None
+    
+    @result.setter
+    def result(self, value):
+        self.result_json = json.dumps(value)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from models.database import Base
+
+class Translation(Base):
+    __tablename__ = 'translations'
+    
+    id = Column(Integer, primary_key=True)
+    source_hash = Column(String(64), nullable=False)
+    target_language = Column(String(10), nullable=False)
+    source_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('uq_translations_source_language', 'source_hash', 'target_language', unique=True),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from models.database import Base
 import json
@@ -22,10 +23,23 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    applications = relationship('Application', back_populates='user')
+    skill_links = relationship('UserSkill', back_populates='user', cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        Index('ix_users_resume_complete', 'resume_complete'),
+        Index('ix_users_trade_lower', func.lower(trade)),
+    )
+    
     @property
     def skills(self):
         if self.skills_json:
-            return json.loads(self.skills_json)
+            # Parsed once per distinct value instead of on every access
+            cached = self.__dict__.get('_skills_cache')
+            if cached is None or cached[0] is not self.skills_json:
+                cached = (self.skills_json, json.loads(self.skills_json))
+                self.__dict__['_skills_cache'] = cached
+            return list(cached[1])
         return []
     
     @skills.setter
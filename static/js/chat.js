@@ -12,32 +12,106 @@ async function sendMessage() {
     input.value = '';
     
     try {
-        const response = await fetch('/worker/chat/message', {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({message})
-        });
+        if (window.ReadableStream && window.TextDecoder) {
+            await streamMessage(message);
+        } else {
+            await postMessage(message);
+        }
+    } catch (error) {
+        addMessageToChat('ai', 'Connection error. Please check your internet and try again.');
+    }
+}
+
+async function postMessage(message) {
+    const response = await fetch('/worker/chat/message', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({message})
+    });
+    
+    const data = await response.json();
+    
+    if (response.ok) {
+        addMessageToChat('ai', data.response);
+        handleAIResponse(data.response, data.is_complete, data.task_id);
+    } else {
+        addMessageToChat('ai', data.error || 'Sorry, I encountered an error. Please try again.');
+    }
+}
+
+async function streamMessage(message) {
+    const response = await fetch('/worker/chat/stream', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({message})
+    });
+    
+    if (!response.ok || !response.body) {
+        addMessageToChat('ai', 'Sorry, I encountered an error. Please try again.');
+        return;
+    }
+    
+    const bubble = addMessageToChat('ai', '');
+    const chatMessages = document.getElementById('chatMessages');
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    
+    while (true) {
+        const {value, done} = await reader.read();
+        if (done) break;
         
-        const data = await response.json();
+        buffer += decoder.decode(value, {stream: true});
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
         
-        if (response.ok) {
-            addMessageToChat('ai', data.response);
-            lastAIResponse = data.response;
-            
-            if (autoSpeak && typeof speakText === 'function') {
-                speakText(data.response, currentLanguage);
-            }
+        for (const raw of events) {
+            const event = parseSSE(raw);
+            if (!event) continue;
             
-            if (data.is_complete) {
-                setTimeout(() => {
-                    window.location.href = '/worker/resume/preview';
-                }, 2000);
+            if (event.type === 'token') {
+                text += event.data.text;
+                bubble.textContent = text;
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            } else if (event.type === 'done') {
+                handleAIResponse(text, event.data.is_complete, event.data.task_id);
+            } else if (event.type === 'error') {
+                bubble.textContent = text || event.data.error || 'Sorry, I encountered an error. Please try again.';
             }
-        } else {
-            addMessageToChat('ai', 'Sorry, I encountered an error. Please try again.');
         }
-    } catch (error) {
-        addMessageToChat('ai', 'Connection error. Please check your internet and try again.');
+    }
+}
+
+function parseSSE(raw) {
+    let type = 'message';
+    let data = '';
+    for (const line of raw.split('\n')) {
+        if (line.startsWith('event: ')) type = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+    }
+    if (!data) return null;
+    return {type, data: JSON.parse(data)};
+}
+
+function handleAIResponse(text, isComplete, taskId) {
+    lastAIResponse = text;
+    
+    if (autoSpeak && typeof speakText === 'function') {
+        speakText(text, currentLanguage);
+    }
+    
+    if (isComplete) {
+        const ready = taskId ? waitForTask(taskId) : Promise.resolve();
+        const minDelay = new Promise(resolve => setTimeout(resolve, 2000));
+        
+        Promise.all([ready, minDelay])
+            .then(() => {
+                window.location.href = '/worker/resume/preview';
+            })
+            .catch(() => {
+                addMessageToChat('ai', 'Sorry, I could not finish your resume. Please try again.');
+            });
     }
 }
 
@@ -52,6 +126,7 @@ function addMessageToChat(role, message) {
     
     chatMessages.appendChild(messageDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    return p;
 }
 
 function toggleSpeaker() {
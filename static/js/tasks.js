@@ -0,0 +1,55 @@
+async function waitForTask(taskId, intervalMs = 1000, timeoutMs = 120000) {
+    const deadline = Date.now() + timeoutMs;
+    
+    while (Date.now() < deadline) {
+        const response = await fetch(`/tasks/${taskId}`);
+        const data = await response.json();
+        
+        if (!response.ok) {
+            throw new Error(data.error || 'Task lookup failed');
+        }
+        if (data.status === 'done') {
+            return data;
+        }
+        if (data.status === 'failed') {
+            throw new Error(data.error || 'Task failed');
+        }
+        
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    
+    throw new Error('Timed out waiting for task');
+}
+
+async function downloadResume() {
+    try {
+        const job = await fetch('/worker/resume/download');
+        if (!job.ok) {
+            alert('Failed to generate PDF');
+            return;
+        }
+        
+        let {task_id, download_url} = await job.json();
+        if (task_id) {
+            const task = await waitForTask(task_id);
+            download_url = task.result.download_url;
+        }
+        
+        const response = await fetch(download_url);
+        if (response.ok) {
+            const blob = await response.blob();
+            const url = window.URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = 'resume.pdf';
+            document.body.appendChild(a);
+            a.click();
+            window.URL.revokeObjectURL(url);
+            document.body.removeChild(a);
+        } else {
+            alert('Failed to generate PDF');
+        }
+    } catch (error) {
+        alert('Error: ' + error.message);
+    }
+}
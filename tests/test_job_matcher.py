@@ -0,0 +1,55 @@
+import random
+
+from utils.job_matcher import score_job_for_user, score_candidates_for_job
+
+WORDS = ['wall', 'to', 'tiling', 'pipe', 'fitting', 'wiring', 'panel', 'door', 'window', 'welding']
+PLACES = ['Bhubaneswar', 'Cuttack', 'Puri', 'New Delhi', 'Delhi', '']
+TRADES = ['Plumber', 'Electrician', 'Tile Setter', 'Carpenter', '']
+
+
+def _skill(rng):
+    # Draw with replacement so multi-word skills can repeat a word ("wall to wall tiling")
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+
+
+def _job(rng):
+    salary_min = rng.randint(0, 500)
+    return {
+        'id': 1,
+        'trade': rng.choice(TRADES),
+        'required_skills': [_skill(rng) for _ in range(rng.randint(0, 4))],
+        'experience_required': rng.randint(0, 10),
+        'location': rng.choice(PLACES),
+        'salary_min': salary_min,
+        'salary_max': salary_min + rng.randint(0, 500),
+    }
+
+
+def _candidate(rng, user_id):
+    return {
+        'id': user_id,
+        'trade': rng.choice(TRADES),
+        'skills': [_skill(rng) for _ in range(rng.randint(0, 5))],
+        'experience_years': rng.randint(0, 12),
+        'location': rng.choice(PLACES),
+    }
+
+
+def test_batch_scores_match_scalar_scores():
+    rng = random.Random(1234)
+    for _ in range(300):
+        job = _job(rng)
+        candidates = [_candidate(rng, user_id) for user_id in range(1, 11)]
+        batch = {m['user_id']: m for m in score_candidates_for_job(job, candidates)}
+        for candidate in candidates:
+            scalar = score_job_for_user(candidate, job)
+            assert batch[candidate['id']]['score'] == scalar['score'], (job, candidate)
+            assert batch[candidate['id']]['reasoning'] == scalar['reasoning'], (job, candidate)
+
+
+def test_repeated_required_word_counts_twice():
+    job = {'id': 1, 'trade': 'Tile Setter', 'required_skills': ['Wall to wall tiling'],
+           'experience_required': 2, 'location': 'Puri'}
+    worker = {'id': 7, 'trade': 'Tile Setter', 'skills': ['Tiling'], 'experience_years': 2, 'location': 'Puri'}
+    [batch] = score_candidates_for_job(job, [worker])
+    assert batch['score'] == score_job_for_user(worker, job)['score']
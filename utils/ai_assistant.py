@@ -1,33 +1,72 @@
-import os
 import json
-from google import genai
 from google.genai import types
-from config import Config
-
-_client = None
-
-def get_client():
-    global _client
-    if _client is None:
-        # Try multiple sources and sanitize common copy/paste issues
-        api_key = (
-            os.environ.get("GEMINI_API_KEY")
-            or os.environ.get("GOOGLE_API_KEY")
-            or getattr(Config, "GEMINI_API_KEY", None)
-        )
-        if api_key:
-            api_key = api_key.strip().strip('"').strip("'")
-        if not api_key:
-            raise ValueError(
-                "Gemini API key not configured. Set GEMINI_API_KEY (or GOOGLE_API_KEY) in your environment."
+from utils.model_router import generate, stream
+from utils.chat_context import ChatContext, RESUME_FIELDS, summary_block, compact_summary
+
+
+REQUIRED_DRAFT_FIELDS = ['name', 'trade', 'skills']
+
+# The worker is waiting on every chat reply
+CHAT_BUDGET = {'latency_budget_ms': 4000, 'cost_budget_usd': 0.005}
+
+_TEXT = types.Schema(type=types.Type.STRING)
+
+DRAFT_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        'name': _TEXT,
+        'trade': _TEXT,
+        'experience_years': types.Schema(type=types.Type.INTEGER),
+        'skills': types.Schema(type=types.Type.ARRAY, items=_TEXT),
+        'location': _TEXT,
+        'education': _TEXT,
+        'certifications': _TEXT,
+        'work_history': types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                properties={'company': _TEXT, 'role': _TEXT, 'duration': _TEXT}
             )
-        _client = genai.Client(api_key=api_key)
-    return _client
+        )
+    }
+)
+
+
+def merge_draft(draft, update):
+    """Merge newly extracted fields into the draft: scalars are replaced,
+    skills and work history are accumulated without duplicates."""
+    merged = dict(draft)
+    for field in RESUME_FIELDS:
+        value = update.get(field)
+        if value in (None, '', [], {}):
+            continue
+        if field == 'skills':
+            skills = list(merged.get('skills') or [])
+            seen = {s.lower() for s in skills}
+            for skill in value:
+                if skill and skill.lower() not in seen:
+                    seen.add(skill.lower())
+                    skills.append(skill)
+            merged['skills'] = skills
+        elif field == 'work_history':
+            history = list(merged.get('work_history') or [])
+            seen = {(j.get('company'), j.get('role')) for j in history}
+            for job in value:
+                key = (job.get('company'), job.get('role'))
+                if key not in seen:
+                    seen.add(key)
+                    history.append(job)
+            merged['work_history'] = history
+        else:
+            merged[field] = value
+    return merged
 
 class ResumeAssistant:
-    def __init__(self, language='en'):
+    def __init__(self, language='en', summary=None, context=None):
         self.language = language
         self.system_prompt = self._get_system_prompt()
+        self.summary = summary or {}
+        self.context = context or ChatContext()
     
     def _get_system_prompt(self):
         if self.language == 'hi':
@@ -109,35 +148,117 @@ Extract structured data in JSON format:
     "work_history": [{"company": "...", "role": "...", "duration": "..."}]
 }"""
     
+    def _system_instruction(self):
+        block = summary_block(self.summary)
+        return f"{self.system_prompt}\n\n{block}" if block else self.system_prompt
+    
+    def _build_contents(self, user_message, chat_history):
+        window = self.context.prompt_window(self._system_instruction(), chat_history, user_message)
+        contents = []
+        for msg in window:
+            role = "user" if msg["role"] == "user" else "model"
+            contents.append(types.Content(role=role, parts=[types.Part(text=msg["content"])]))
+        
+        contents.append(types.Content(role="user", parts=[types.Part(text=user_message)]))
+        return contents
+    
+    def _chat_config(self):
+        return types.GenerateContentConfig(
+            system_instruction=self._system_instruction(),
+            temperature=0.7
+        )
+    
     def chat(self, user_message, chat_history=None):
         if chat_history is None:
             chat_history = []
         
         try:
-            contents = []
-            for msg in chat_history:
-                role = "user" if msg["role"] == "user" else "model"
-                contents.append(types.Content(role=role, parts=[types.Part(text=msg["content"])]))
-            
-            contents.append(types.Content(role="user", parts=[types.Part(text=user_message)]))
+            response = generate(
+                'chat',
+                contents=self._build_contents(user_message, chat_history),
+                config=self._chat_config(),
+                **CHAT_BUDGET
+            )
             
-            response = get_client().models.generate_content(
-                model="gemini-2.5-flash",
-                contents=contents,
+            return response.text if response.text else "I'm here to help you build your resume."
+        
+        except Exception as e:
+            # Callers show a retry message; error text never goes into the chat history
+            print(f"Error generating chat reply: {e}")
+            return None
+    
+    def chat_stream(self, user_message, chat_history=None):
+        """Yield the reply text piece by piece as Gemini streams it back."""
+        if chat_history is None:
+            chat_history = []
+        
+        for chunk in stream(
+            'chat',
+            contents=self._build_contents(user_message, chat_history),
+            config=self._chat_config(),
+            **CHAT_BUDGET
+        ):
+            if chunk.text:
+                yield chunk.text
+    
+    def fold_history(self, chat_history, pending=0):
+        """Return the verbatim tail to store. Older messages are already merged
+        into the draft profile by update_draft, so they can simply be dropped;
+        the last `pending` messages (not yet extracted) are always kept."""
+        evicted, kept = self.context.split_for_storage(chat_history, min_keep=pending)
+        return kept
+    
+    def update_draft(self, messages):
+        """Extract resume fields from just the latest messages with the flash
+        model and merge them into the draft profile. Returns False if the
+        extraction failed, so the caller can retry these messages next turn."""
+        prompt = f"""You are filling in a worker's resume draft from a conversation.
+
+Current draft:
+{json.dumps(compact_summary(self.summary), ensure_ascii=False)}
+
+Latest messages:
+{json.dumps(messages, ensure_ascii=False)}
+
+Return only the fields that the latest messages add or correct. Omit everything else."""
+        
+        try:
+            response = generate(
+                'draft_update',
+                contents=prompt,
                 config=types.GenerateContentConfig(
-                    system_instruction=self.system_prompt,
-                    temperature=0.7
-                )
+                    response_mime_type="application/json",
+                    response_schema=DRAFT_SCHEMA,
+                    temperature=0
+                ),
+                # Runs as a background task, off the chat reply
+                latency_budget_ms=10000,
+                cost_budget_usd=0.005
             )
             
-            return response.text if response.text else "I'm here to help you build your resume."
+            if response.text:
+                self.summary = merge_draft(self.summary, json.loads(response.text))
+            return True
         
         except Exception as e:
-            return f"Error: {str(e)}"
+            print(f"Error updating resume draft: {e}")
+            return False
+    
+    def finalize_resume_data(self, chat_history):
+        """Resume data for a completed chat. Normally the incrementally built
+        draft; falls back to a full extraction if key fields are missing."""
+        if all(self.summary.get(field) for field in REQUIRED_DRAFT_FIELDS):
+            return dict(self.summary)
+        return self.extract_resume_data(chat_history)
     
     def extract_resume_data(self, chat_history):
+        summary = compact_summary(self.summary)
+        earlier = f"""
+Details gathered earlier in the conversation:
+{json.dumps(summary, indent=2, ensure_ascii=False)}
+""" if summary else ""
         prompt = f"""Based on this conversation, extract all resume information in JSON format.
-        
+{earlier}
 Conversation:
 {json.dumps(chat_history, indent=2)}
 
@@ -154,18 +275,22 @@ Return only valid JSON with this structure:
 }}"""
         
         try:
-            response = get_client().models.generate_content(
-                model="gemini-2.5-pro",
+            response = generate(
+                'resume_extraction',
                 contents=prompt,
                 config=types.GenerateContentConfig(
                     response_mime_type="application/json"
-                )
+                ),
+                latency_budget_ms=30000,
+                cost_budget_usd=0.05
             )
             
+            resume_data = dict(summary)
             if response.text:
-                return json.loads(response.text)
-            return {}
+                extracted = json.loads(response.text)
+                resume_data.update({k: v for k, v in extracted.items() if v not in (None, '', [])})
+            return resume_data
         
         except Exception as e:
             print(f"Error extracting resume data: {e}")
-            return {}
+            return dict(summary)
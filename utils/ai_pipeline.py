@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=Config.AI_PIPELINE_WORKERS,
+                                               thread_name_prefix='pipeline')
+    return _executor
+
+
+def _ready(pending, results):
+    """Pop the pending stages whose dependencies have all finished."""
+    ready = []
+    for name, (fn, deps) in list(pending.items()):
+        if all(dep in results for dep in deps):
+            del pending[name]
+            ready.append((name, fn, {dep: results[dep] for dep in deps}))
+    return ready
+
+
+def run_pipeline(stages):
+    """Run {name: (fn, deps)} stages on the pipeline thread pool, each one as soon
+    as the stages named in deps have finished; fn gets their results as keyword
+    arguments. Returns {name: result}; a failing stage's exception is raised."""
+    results = {}
+    pending = dict(stages)
+    running = {}
+    while pending or running:
+        for name, fn, kwargs in _ready(pending, results):
+            running[_pool().submit(fn, **kwargs)] = name
+        if not running:
+            raise ValueError(f"Unsatisfiable pipeline stages: {sorted(pending)}")
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[running.pop(future)] = future.result()
+    return results
+
@@ -0,0 +1,80 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from werkzeug.utils import secure_filename
+from config import Config
+from utils import pdf_cache
+from utils.tasks import resume_pdf_source, render_resume_pdf_to_cache
+
+
+class _ChunkSink:
+    """Write-only file object for ZipFile; the archive is drained after each member
+    so only one PDF is held in memory at a time."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _resume_pdf(app, user):
+    """Cached (or freshly rendered) PDF path for one worker."""
+    with app.app_context():
+        user_data, key = resume_pdf_source(user)
+        return pdf_cache.cached_pdf(user.id, key) or render_resume_pdf_to_cache(user.id, user_data, key)
+
+
+class NothingExportedError(RuntimeError):
+    """Raised by stream_resume_zip, before any output, when no resume could be rendered."""
+
+
+def _skipped_note(skipped):
+    lines = ["These resumes could not be generated and are not in this archive.",
+             "Export them again later, or download them individually.", ""]
+    lines += [f"{user.name or 'Worker'} (worker id {user.id})" for user in skipped]
+    return '\n'.join(lines) + '\n'
+
+
+def stream_resume_zip(app, users):
+    """Yield a ZIP of the workers' resume PDFs, rendered in parallel and written
+    to the archive as each one finishes. Workers whose resume failed to render
+    are listed in an errors.txt member; if none rendered, NothingExportedError
+    is raised before the first chunk, so the caller can still answer with an error."""
+    sink = _ChunkSink()
+    executor = ThreadPoolExecutor(max_workers=Config.BULK_EXPORT_WORKERS, thread_name_prefix='export')
+    try:
+        futures = {executor.submit(_resume_pdf, app, user): user for user in users}
+        skipped = []
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for future in as_completed(futures):
+                user = futures[future]
+                try:
+                    path = future.result()
+                except Exception as e:
+                    print(f"Error exporting resume for user {user.id}: {e}")
+                    path = None
+                if not path:
+                    skipped.append(user)
+                    continue
+
+                name = secure_filename(f"{user.name or 'worker'}_{user.id}_Resume.pdf")
+                with open(path, 'rb') as f:
+                    archive.writestr(name, f.read())
+                yield sink.drain()
+
+            if len(skipped) == len(futures):
+                raise NothingExportedError(f"None of the {len(skipped)} resumes could be generated")
+            if skipped:
+                archive.writestr('errors.txt', _skipped_note(sorted(skipped, key=lambda u: u.id)))
+        yield sink.drain()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,57 @@
+import json
+from config import Config
+
+RESUME_FIELDS = ['name', 'trade', 'experience_years', 'skills', 'location',
+                 'education', 'certifications', 'work_history']
+
+
+def estimate_tokens(text):
+    # Rough rule of thumb for Gemini tokenizers; good enough for budgeting
+    return len(text) // 4 + 1
+
+
+def compact_summary(summary):
+    """Only the resume fields that have actually been gathered."""
+    return {k: summary[k] for k in RESUME_FIELDS if summary.get(k) not in (None, '', [], {})}
+
+
+def summary_block(summary):
+    gathered = compact_summary(summary or {})
+    if not gathered:
+        return ''
+    return ("Resume details gathered earlier in this conversation "
+            "(older messages were summarized):\n" + json.dumps(gathered, ensure_ascii=False))
+
+
+class ChatContext:
+    """Keeps the assistant's prompt bounded: the last max_turns exchanges
+    verbatim, everything older represented by the structured draft profile,
+    and the whole prompt capped at token_budget."""
+
+    def __init__(self, max_turns=None, token_budget=None):
+        self.max_turns = max_turns or Config.CHAT_CONTEXT_TURNS
+        self.token_budget = token_budget or Config.CHAT_PROMPT_TOKEN_BUDGET
+
+    def prompt_window(self, system_instruction, chat_history, user_message):
+        """Most recent messages that fit in the budget alongside the system
+        instruction and the new message."""
+        remaining = self.token_budget - estimate_tokens(system_instruction) - estimate_tokens(user_message)
+        window = []
+        for msg in reversed(chat_history[-2 * self.max_turns:]):
+            cost = estimate_tokens(msg["content"])
+            if cost > remaining:
+                break
+            window.append(msg)
+            remaining -= cost
+        window.reverse()
+        # Gemini expects the conversation to open with a user turn
+        while window and window[0]["role"] != "user":
+            window.pop(0)
+        return window
+
+    def split_for_storage(self, chat_history, min_keep=0):
+        """(evicted, kept): messages older than the window and the verbatim tail to store."""
+        keep = max(2 * self.max_turns, min_keep)
+        if len(chat_history) <= keep:
+            return [], chat_history
+        return chat_history[:-keep], chat_history[-keep:]
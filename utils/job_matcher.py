@@ -1,27 +1,148 @@
-import os
+import re
 import json
-from google import genai
+import numpy as np
 from google.genai import types
 from config import Config
+from utils.model_router import generate
 
-_client = None
+# Same weighting the matching prompt has always described
+SKILL_WEIGHT = 0.4
+EXPERIENCE_WEIGHT = 0.3
+LOCATION_WEIGHT = 0.2
+GROWTH_WEIGHT = 0.1
 
-def get_client():
-    global _client
-    if _client is None:
-        api_key = (
-            os.environ.get("GEMINI_API_KEY")
-            or os.environ.get("GOOGLE_API_KEY")
-            or getattr(Config, "GEMINI_API_KEY", None)
-        )
-        if api_key:
-            api_key = api_key.strip().strip('"').strip("'")
-        if not api_key:
-            raise ValueError("Gemini API key not configured. Set GEMINI_API_KEY (or GOOGLE_API_KEY) in your environment.")
-        _client = genai.Client(api_key=api_key)
-    return _client
-
-def match_jobs_for_user(user_data, jobs_list):
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(value):
+    if not value:
+        return set()
+    return set(_TOKEN_RE.findall(str(value).lower()))
+
+
+def normalize_text(value):
+    if not value:
+        return ''
+    return ' '.join(_TOKEN_RE.findall(str(value).lower()))
+
+
+def skill_credit(required_skill, user_skill_names, user_skill_tokens):
+    """Credit in [0, 1] for one required skill: 1 for an exact match,
+    half credit scaled by shared words for a partial match."""
+    if required_skill in user_skill_names:
+        return 1.0
+    tokens = required_skill.split()
+    shared = sum(1 for t in tokens if t in user_skill_tokens)
+    return 0.5 * shared / len(tokens)
+
+
+def trade_score(user_trade, job_trade):
+    user_norm = normalize_text(user_trade)
+    job_norm = normalize_text(job_trade)
+    if not user_norm or not job_norm:
+        return 0.0
+    if user_norm == job_norm:
+        return 1.0
+    return 0.5 if tokenize(user_norm) & tokenize(job_norm) else 0.0
+
+
+def experience_score(user_years, required_years):
+    user_years = user_years or 0
+    required_years = required_years or 0
+    if user_years >= required_years:
+        return 1.0
+    return max(0.0, 1.0 - (required_years - user_years) / (required_years + 1))
+
+
+def location_score(user_location, job_location):
+    user_tokens = tokenize(user_location)
+    job_tokens = tokenize(job_location)
+    if not user_tokens or not job_tokens:
+        return 0.5
+    if user_tokens == job_tokens:
+        return 1.0
+    shared = len(user_tokens & job_tokens)
+    return 0.8 * shared / min(len(user_tokens), len(job_tokens))
+
+
+def salary_headroom(salary_min, salary_max):
+    salary_min = salary_min or 0
+    salary_max = salary_max or 0
+    if salary_max <= 0 or salary_max <= salary_min:
+        return 0.0
+    return (salary_max - salary_min) / salary_max
+
+
+def combine_scores(skill, experience, location, growth):
+    weighted = (SKILL_WEIGHT * skill + EXPERIENCE_WEIGHT * experience
+                + LOCATION_WEIGHT * location + GROWTH_WEIGHT * growth)
+    # np.round so scalar and batch scoring agree on half-way values
+    return float(np.round(1 + 9 * weighted, 1))
+
+
+def build_reasoning(matched_skills, total_skills, user_years, required_years, location, trade):
+    parts = []
+    if total_skills:
+        parts.append(f"Matches {matched_skills} of {total_skills} required skills")
+    elif trade >= 1.0:
+        parts.append("Same trade")
+
+    user_years = user_years or 0
+    required_years = required_years or 0
+    if user_years >= required_years:
+        parts.append(f"meets experience requirement ({user_years} yrs vs {required_years} required)")
+    else:
+        parts.append(f"{required_years - user_years} years short of required experience")
+
+    if location >= 1.0:
+        parts.append("same location")
+    elif location > 0.5:
+        parts.append("nearby location")
+    elif location == 0.5:
+        parts.append("location not specified")
+    else:
+        parts.append("different location")
+
+    return ', '.join(parts)
+
+
+def score_job_for_user(user_data, job):
+    """Score one job for one worker on the 1-10 scale used by the templates."""
+    user_skills = user_data.get('skills', []) or []
+    user_skill_names = {normalize_text(s) for s in user_skills}
+    user_skill_tokens = set()
+    for s in user_skills:
+        user_skill_tokens |= tokenize(s)
+
+    # Sorted so the credit sum doesn't depend on where the list was read from
+    required = sorted({normalize_text(s) for s in job.get('required_skills', []) or []} - {''})
+
+    trade = trade_score(user_data.get('trade'), job.get('trade'))
+
+    if required:
+        credits = [skill_credit(s, user_skill_names, user_skill_tokens) for s in required]
+        skill = sum(credits) / len(required)
+        matched = sum(1 for c in credits if c >= 1.0)
+    else:
+        skill = trade
+        matched = 0
+
+    experience = experience_score(user_data.get('experience_years'), job.get('experience_required'))
+    location = location_score(user_data.get('location'), job.get('location'))
+    growth = 0.6 * trade + 0.4 * salary_headroom(job.get('salary_min'), job.get('salary_max'))
+
+    return {
+        "job_id": job.get('id'),
+        "score": combine_scores(skill, experience, location, growth),
+        "reasoning": build_reasoning(matched, len(required), user_data.get('experience_years'),
+                                     job.get('experience_required'), location, trade)
+    }
+
+
+def rerank_with_llm(user_data, jobs_list, matches):
+    """Ask Gemini to re-order locally scored matches. Falls back to the
+    local order if the call fails or returns something unusable."""
+    jobs_by_id = {job.get('id'): job for job in jobs_list}
     user_info = f"""
 Worker Profile:
 - Trade: {user_data.get('trade', 'N/A')}
@@ -29,25 +150,27 @@ Worker Profile:
 - Skills: {', '.join(user_data.get('skills', []))}
 - Location: {user_data.get('location', 'N/A')}
 """
-    
+
     jobs_info = []
-    for job in jobs_list:
+    for match in matches:
+        job = jobs_by_id[match['job_id']]
         jobs_info.append({
-            "job_id": job.get('id'),
+            "job_id": match['job_id'],
             "title": job.get('title'),
             "trade": job.get('trade'),
             "required_skills": job.get('required_skills', []),
             "experience_required": job.get('experience_required', 0),
             "location": job.get('location'),
-            "salary_range": f"{job.get('salary_min', 0)}-{job.get('salary_max', 0)}"
+            "salary_range": f"{job.get('salary_min', 0)}-{job.get('salary_max', 0)}",
+            "local_score": match['score']
         })
-    
+
     prompt = f"""{user_info}
 
-Available Jobs:
+Candidate Jobs (already pre-scored locally):
 {json.dumps(jobs_info, indent=2)}
 
-Score each job for this worker on a scale of 1-10 based on:
+Re-score each job for this worker on a scale of 1-10 based on:
 - Skill overlap (40%)
 - Experience match (30%)
 - Location proximity (20%)
@@ -60,23 +183,137 @@ Return JSON array sorted by score (highest first):
         "score": 8.5,
         "reasoning": "Strong skill match, location nearby, slightly more experience than required"
     }}
-]
+]"""
 
-Return only top 10 matches."""
-    
     try:
-        response = get_client().models.generate_content(
-            model="gemini-2.5-pro",
+        response = generate(
+            'match_rerank',
             contents=prompt,
             config=types.GenerateContentConfig(
                 response_mime_type="application/json"
-            )
+            ),
+            cache_ttl=Config.LLM_CACHE_TTL_RERANK,
+            # Holds up the recommendations page, so tighter than the resume calls
+            latency_budget_ms=8000,
+            cost_budget_usd=0.04
         )
-        
-        if response.text:
-            return json.loads(response.text)
-        return []
-    
+
+        return _merge_reranked(json.loads(response.text), matches) if response.text else matches
+
     except Exception as e:
-        print(f"Error matching jobs: {e}")
+        print(f"Error re-ranking jobs: {e}")
+        return matches
+
+
+def _merge_reranked(reply, matches):
+    """Validated model order: entries must name one of the given jobs, scores are
+    clamped to 0-10 and missing reasoning falls back to the local one. Jobs the
+    model left out follow in their local order."""
+    local = {m['job_id']: m for m in matches}
+    reranked = []
+    for item in reply if isinstance(reply, list) else []:
+        if not isinstance(item, dict) or item.get('job_id') not in local:
+            continue
+        original = local.pop(item['job_id'])
+        try:
+            score = round(min(10.0, max(0.0, float(item.get('score')))), 1)
+        except (TypeError, ValueError):
+            score = original['score']
+        reasoning = item.get('reasoning')
+        if not isinstance(reasoning, str) or not reasoning.strip():
+            reasoning = original['reasoning']
+        reranked.append({'job_id': original['job_id'], 'score': score, 'reasoning': reasoning})
+    return reranked + [m for m in matches if m['job_id'] in local]
+
+
+def score_candidates_for_job(job, candidates, top_k=None):
+    """Score N candidate profiles against one job in a single vectorized pass.
+
+    Produces the same scores as score_job_for_user, but builds skill, experience
+    and location feature arrays for all candidates at once and only formats
+    reasoning for the returned top_k.
+    """
+    if not candidates:
         return []
+
+    # Sorted so the credit sum doesn't depend on where the list was read from
+    required = sorted({normalize_text(s) for s in job.get('required_skills', []) or []} - {''})
+    vocab = sorted({t for s in required for t in s.split()})
+    vocab_index = {t: i for i, t in enumerate(vocab)}
+    job_location = tokenize(job.get('location'))
+
+    n = len(candidates)
+    exact = np.zeros((n, len(required)), dtype=bool)
+    has_token = np.zeros((n, len(vocab)), dtype=np.float64)
+    years = np.zeros(n)
+    trade = np.zeros(n)
+    loc_shared = np.zeros(n)
+    loc_size = np.zeros(n)
+    loc_equal = np.zeros(n, dtype=bool)
+
+    for i, candidate in enumerate(candidates):
+        skills = candidate.get('skills', []) or []
+        names = {normalize_text(s) for s in skills}
+        exact[i] = [s in names for s in required]
+        for s in skills:
+            for t in tokenize(s):
+                if t in vocab_index:
+                    has_token[i, vocab_index[t]] = 1.0
+
+        years[i] = candidate.get('experience_years') or 0
+        trade[i] = trade_score(candidate.get('trade'), job.get('trade'))
+
+        tokens = tokenize(candidate.get('location'))
+        loc_size[i] = len(tokens)
+        loc_shared[i] = len(tokens & job_location)
+        loc_equal[i] = bool(tokens) and tokens == job_location
+
+    if required:
+        membership = np.zeros((len(required), len(vocab)))
+        for j, s in enumerate(required):
+            # Repeated words count once per occurrence, as in skill_credit
+            for t in s.split():
+                membership[j, vocab_index[t]] += 1.0
+        word_counts = membership.sum(axis=1)
+        shared_words = has_token @ membership.T
+        credit = np.where(exact, 1.0, 0.5 * shared_words / word_counts)
+        skill = credit.sum(axis=1) / len(required)
+        matched = exact.sum(axis=1)
+    else:
+        skill = trade
+        matched = np.zeros(n, dtype=int)
+
+    required_years = job.get('experience_required') or 0
+    experience = np.where(
+        years >= required_years,
+        1.0,
+        np.maximum(0.0, 1.0 - (required_years - years) / (required_years + 1))
+    )
+
+    if job_location:
+        overlap = 0.8 * loc_shared / np.maximum(np.minimum(loc_size, len(job_location)), 1)
+        location = np.where(loc_size == 0, 0.5, np.where(loc_equal, 1.0, overlap))
+    else:
+        location = np.full(n, 0.5)
+
+    growth = 0.6 * trade + 0.4 * salary_headroom(job.get('salary_min'), job.get('salary_max'))
+
+    weighted = (SKILL_WEIGHT * skill + EXPERIENCE_WEIGHT * experience
+                + LOCATION_WEIGHT * location + GROWTH_WEIGHT * growth)
+    scores = np.round(1 + 9 * weighted, 1)
+
+    ids = np.array([c.get('id') or 0 for c in candidates])
+    order = np.lexsort((ids, -scores))
+    if top_k is not None:
+        order = order[:top_k]
+
+    results = []
+    for i in order:
+        candidate = candidates[i]
+        results.append({
+            "user_id": candidate.get('id'),
+            "score": float(scores[i]),
+            "reasoning": build_reasoning(int(matched[i]), len(required), candidate.get('experience_years'),
+                                         job.get('experience_required'), float(location[i]), float(trade[i]))
+        })
+    return results
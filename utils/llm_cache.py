@@ -0,0 +1,116 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from pydantic import BaseModel
+
+
+def _to_jsonable(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json', exclude_none=True)
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items()}
+    return value
+
+
+def cache_key(model, contents, config=None):
+    """Content address for a model call: sha256 over (model, prompt, config)."""
+    payload = json.dumps([model, _to_jsonable(contents), _to_jsonable(config)],
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """Two-tier response cache: an in-process LRU in front of an optional
+    SQLite file that every gunicorn worker on the host can share."""
+
+    def __init__(self, max_entries=512, db_path=None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+        if db_path:
+            self._init_disk()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_disk(self):
+        try:
+            with self._connect() as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS llm_cache ('
+                    'key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)'
+                )
+        except sqlite3.Error as e:
+            print(f"LLM cache disk tier disabled: {e}")
+            self.db_path = None
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _remember(self, key, payload, expires_at):
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return entry[0]
+                del self._entries[key]
+
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        'SELECT payload, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?',
+                        (key, now)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                print(f"LLM cache read error: {e}")
+                row = None
+            if row:
+                self._remember(key, row[0], row[1])
+                self._count('disk_hits')
+                return row[0]
+
+        self._count('misses')
+        return None
+
+    def set(self, key, payload, ttl):
+        expires_at = time.time() + ttl
+        self._remember(key, payload, expires_at)
+        self._count('stores')
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO llm_cache (key, payload, expires_at) VALUES (?, ?, ?)',
+                        (key, payload, expires_at)
+                    )
+                    conn.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (time.time(),))
+            except sqlite3.Error as e:
+                print(f"LLM cache write error: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else 0.0
+        return stats
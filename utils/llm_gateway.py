@@ -0,0 +1,326 @@
+import os
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager, ExitStack
+import httpx
+from google import genai
+from google.genai import types
+from config import Config
+from utils.llm_cache import LLMCache, cache_key
+from utils.llm_resilience import (TokenBucket, CircuitBreaker, is_retryable, status_code,
+                                  retry_after_seconds, backoff_delay)
+
+# One client (and one keep-alive connection pool) per process, shared by every
+# utility module and every gunicorn thread.
+_client = None
+_client_lock = threading.Lock()
+
+_model_slots = {}
+_model_slots_lock = threading.Lock()
+
+_cache = LLMCache(max_entries=Config.LLM_CACHE_MAX_ENTRIES, db_path=Config.LLM_CACHE_DB_PATH)
+
+# Single-flight: identical calls already in progress in this process are joined
+# rather than sent again.
+_inflight = {}
+_inflight_lock = threading.Lock()
+_flight_stats = {'leaders': 0, 'coalesced': 0}
+_last_call = threading.local()
+
+
+_buckets = {}
+_breakers = {}
+_guards_lock = threading.Lock()
+_counters = defaultdict(lambda: defaultdict(int))
+_counters_lock = threading.Lock()
+
+
+class LLMBusyError(RuntimeError):
+    """Raised when a model's concurrency or rate limit stays saturated past the wait timeout."""
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised without calling the API while a model's circuit breaker is open."""
+
+
+class LLMDeadlineError(RuntimeError):
+    """Raised when a call's deadline passes while it is still waiting to be made."""
+
+
+def _remaining(deadline):
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _wait_limit(deadline):
+    """How long to wait for a slot or rate token: the usual limit, cut short by the deadline."""
+    remaining = _remaining(deadline)
+    return Config.LLM_SLOT_WAIT_SECONDS if remaining is None else max(0.0, min(Config.LLM_SLOT_WAIT_SECONDS, remaining))
+
+
+def _until(config, deadline):
+    """config with its HTTP timeout shortened so the request ends by the deadline."""
+    remaining = _remaining(deadline)
+    if remaining is None or remaining >= Config.LLM_TIMEOUT_SECONDS:
+        return config
+    config = config or types.GenerateContentConfig()
+    http_options = config.http_options or types.HttpOptions()
+    http_options = http_options.model_copy(update={'timeout': max(1, int(remaining * 1000))})
+    return config.model_copy(update={'http_options': http_options})
+
+
+def _api_key():
+    api_key = (
+        os.environ.get("GEMINI_API_KEY")
+        or os.environ.get("GOOGLE_API_KEY")
+        or getattr(Config, "GEMINI_API_KEY", None)
+    )
+    if api_key:
+        api_key = api_key.strip().strip('"').strip("'")
+    if not api_key:
+        raise ValueError("Gemini API key not configured. Set GEMINI_API_KEY (or GOOGLE_API_KEY) in your environment.")
+    return api_key
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                limits = httpx.Limits(
+                    max_connections=Config.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=Config.LLM_KEEPALIVE_EXPIRY_SECONDS
+                )
+                _client = genai.Client(
+                    api_key=_api_key(),
+                    http_options=types.HttpOptions(
+                        timeout=int(Config.LLM_TIMEOUT_SECONDS * 1000),
+                        client_args={'limits': limits}
+                    )
+                )
+    return _client
+
+
+def _count(model, name):
+    with _counters_lock:
+        _counters[model][name] += 1
+
+
+def _guards_for(model):
+    with _guards_lock:
+        if model not in _buckets:
+            rate = Config.LLM_RATE_PER_MINUTE.get(model, Config.LLM_DEFAULT_RATE_PER_MINUTE)
+            _buckets[model] = TokenBucket(rate, Config.LLM_RATE_BURST)
+            _breakers[model] = CircuitBreaker(Config.LLM_BREAKER_FAILURES, Config.LLM_BREAKER_COOLDOWN_SECONDS)
+        return _buckets[model], _breakers[model]
+
+
+def _call_with_retries(model, call, deadline=None):
+    """Run call() under the model's rate limit and circuit breaker, retrying
+    throttling, 5xx and transport errors with jittered exponential backoff.
+    No retry is started that could not finish its backoff before deadline
+    (a time.monotonic() value)."""
+    bucket, breaker = _guards_for(model)
+    if not breaker.allow():
+        _count(model, 'short_circuited')
+        raise LLMUnavailableError(f"{model} is temporarily unavailable")
+
+    attempt = 0
+    while True:
+        remaining = _remaining(deadline)
+        if remaining is not None and remaining <= 0:
+            _count(model, 'deadline_exceeded')
+            raise LLMDeadlineError(f"Deadline passed before calling {model}")
+        if not bucket.acquire(_wait_limit(deadline)):
+            _count(model, 'rate_limited')
+            raise LLMBusyError(f"Rate limit for {model} exhausted")
+        _count(model, 'requests')
+        try:
+            result = call()
+        except Exception as e:
+            if not is_retryable(e):
+                # The API answered (or the request was malformed); not a health signal
+                breaker.record_success()
+                _count(model, 'errors')
+                raise
+            if status_code(e) == 429:
+                bucket.throttled()
+                _count(model, 'throttled')
+
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            remaining = _remaining(deadline)
+            out_of_time = remaining is not None and delay >= remaining
+            if out_of_time or attempt >= Config.LLM_MAX_RETRIES or delay > Config.LLM_RETRY_AFTER_MAX_SECONDS:
+                breaker.record_failure()
+                _count(model, 'failures')
+                if out_of_time:
+                    _count(model, 'deadline_exceeded')
+                raise
+            attempt += 1
+            _count(model, 'retries')
+            time.sleep(delay)
+            continue
+
+        bucket.succeeded()
+        breaker.record_success()
+        return result
+
+
+def _slots_for(model):
+    slots = _model_slots.get(model)
+    if slots is None:
+        with _model_slots_lock:
+            slots = _model_slots.get(model)
+            if slots is None:
+                limit = Config.LLM_MODEL_CONCURRENCY.get(model, Config.LLM_DEFAULT_CONCURRENCY)
+                slots = threading.BoundedSemaphore(limit)
+                _model_slots[model] = slots
+    return slots
+
+
+@contextmanager
+def model_slot(model, deadline=None):
+    slots = _slots_for(model)
+    if not slots.acquire(timeout=_wait_limit(deadline)):
+        raise LLMBusyError(f"Too many concurrent requests to {model}")
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def _single_flight(key, call, deadline=None):
+    """Run call() once per key at a time; concurrent callers with the same key
+    wait (until their deadline) for that run and share its response (or its exception)."""
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+            _flight_stats['leaders'] += 1
+        else:
+            _flight_stats['coalesced'] += 1
+
+    _last_call.shared = not leader
+    if not leader:
+        if not flight.done.wait(_remaining(deadline) if deadline is not None else None):
+            raise LLMDeadlineError("Deadline passed while waiting for an identical call in flight")
+        if flight.error is not None:
+            raise flight.error
+        return flight.response
+
+    try:
+        flight.response = call()
+        return flight.response
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+
+
+def generate_content(model, contents, config=None, cache_ttl=None, deadline=None):
+    """Run generate_content on the shared client within the model's concurrency limit.
+
+    Identical (model, contents, config) calls made while one is in flight share
+    its response. With cache_ttl (seconds), they are also answered from the
+    response cache until the entry expires. With deadline (a time.monotonic()
+    value), waiting, retries and the request's HTTP timeout all end by then.
+    """
+    key = cache_key(model, contents, config)
+    _last_call.cached = False
+    _last_call.shared = False
+    if cache_ttl:
+        cached = _cache.get(key)
+        if cached is not None:
+            _last_call.cached = True
+            return types.GenerateContentResponse.model_validate_json(cached)
+
+    def request():
+        with model_slot(model, deadline):
+            return get_client().models.generate_content(model=model, contents=contents,
+                                                        config=_until(config, deadline))
+
+    def call():
+        response = _call_with_retries(model, request, deadline)
+        if cache_ttl and response.text:
+            _cache.set(key, response.model_dump_json(exclude_none=True), cache_ttl)
+        return response
+
+    return _single_flight(key, call, deadline)
+
+
+def last_call_cached():
+    """Whether this thread's most recent generate_content was served from the cache."""
+    return getattr(_last_call, 'cached', False)
+
+
+def last_call_shared():
+    """Whether this thread's most recent generate_content joined another caller's
+    in-flight request instead of making its own (its response or error is that call's)."""
+    return getattr(_last_call, 'shared', False)
+
+
+def stream_content(model, contents, config=None, deadline=None):
+    """Yield generate_content_stream chunks, holding the model slot until the stream ends.
+
+    Opening the stream (up to the first chunk) is retried like generate_content,
+    within the deadline; a failure after that surfaces to the caller.
+    """
+    def open_stream():
+        stack = ExitStack()
+        stack.enter_context(model_slot(model, deadline))
+        try:
+            stream = iter(get_client().models.generate_content_stream(model=model, contents=contents,
+                                                                       config=_until(config, deadline)))
+            first = next(stream, None)
+        except BaseException:
+            stack.close()
+            raise
+        return stack, stream, first
+
+    stack, stream, first = _call_with_retries(model, open_stream, deadline)
+    with stack:
+        if first is not None:
+            yield first
+        for chunk in stream:
+            yield chunk
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def coalescing_stats():
+    with _inflight_lock:
+        return {
+            'calls': _flight_stats['leaders'],
+            'coalesced': _flight_stats['coalesced'],
+            'in_flight': len(_inflight)
+        }
+
+
+def resilience_stats():
+    """Per-model request/retry/throttle/failure counters with breaker state and current rate."""
+    with _counters_lock:
+        counters = {model: dict(values) for model, values in _counters.items()}
+    with _guards_lock:
+        models = list(_buckets)
+    result = {}
+    for model in models:
+        bucket, breaker = _buckets[model], _breakers[model]
+        result[model] = dict(counters.get(model, {}), breaker=breaker.state,
+                             rate_per_minute=bucket.rate_per_minute())
+    return result
@@ -0,0 +1,137 @@
+import re
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
+from google.genai import errors
+from config import Config
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Never throttle a model below this share of its configured rate
+MIN_RATE_FRACTION = 0.1
+
+_RETRY_DELAY_RE = re.compile(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s")
+
+
+class TokenBucket:
+    """Per-model request rate limit. The rate halves on every 429 and creeps back
+    up on success, so a throttled model is backed off for everyone in the process."""
+
+    def __init__(self, rate_per_minute, burst):
+        self.base_rate = rate_per_minute / 60.0
+        self.rate = self.base_rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def throttled(self):
+        with self.lock:
+            self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def succeeded(self):
+        with self.lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+    def rate_per_minute(self):
+        return round(self.rate * 60, 1)
+
+
+class CircuitBreaker:
+    """Opens after LLM_BREAKER_FAILURES consecutive failed calls; while open, calls
+    fail immediately. After the cooldown one trial call is let through; if that trial
+    never reports back, another is let through after a further cooldown."""
+
+    def __init__(self, failure_threshold, cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == 'closed':
+                return True
+            now = time.monotonic()
+            if now - self.opened_at >= self.cooldown:
+                # Also covers a half-open trial that gave up (e.g. on the rate limit)
+                # without recording a result
+                self.state = 'half_open'
+                self.opened_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+def status_code(error):
+    if isinstance(error, errors.APIError):
+        return error.code
+    return None
+
+
+def is_retryable(error):
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+def retry_after_seconds(error):
+    """Server-requested delay from a Retry-After header or a RetryInfo detail, if any."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    value = headers.get('retry-after') if headers is not None else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(value)
+                return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    match = _RETRY_DELAY_RE.search(str(getattr(error, 'details', '') or ''))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt):
+    # Full jitter keeps retries from many threads from landing in lockstep
+    cap = min(Config.LLM_BACKOFF_MAX_SECONDS, Config.LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, cap)
@@ -0,0 +1,105 @@
+from models.match_score import MatchScore
+from models.user import User
+from models.job import Job
+from models.organization import Organization
+from models.pagination import keyset_page
+from utils.job_matcher import score_job_for_user, score_candidates_for_job
+from models.skill import UserSkill, JobSkill, linked_skill_names
+from utils.skill_index import candidate_users_query, candidate_jobs_query
+
+
+def user_profile(user, skills=None):
+    return {
+        'id': user.id,
+        'name': user.name,
+        'trade': user.trade,
+        'experience_years': user.experience_years,
+        'skills': user.skills if skills is None else skills,
+        'location': user.location
+    }
+
+
+def job_profile(job, skills=None):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'trade': job.trade,
+        'required_skills': job.required_skills if skills is None else skills,
+        'experience_required': job.experience_required,
+        'location': job.location,
+        'salary_min': job.salary_min,
+        'salary_max': job.salary_max
+    }
+
+
+def refresh_job_matches(db, job):
+    """Re-score one job against every worker that shares a skill or trade."""
+    db.query(MatchScore).filter_by(job_id=job.id).delete(synchronize_session=False)
+    if job.status != 'active':
+        return
+
+    users = candidate_users_query(db, job.required_skills, job.trade).all()
+    skills = linked_skill_names(db, UserSkill, [u.id for u in users])
+    candidates = [user_profile(u, skills[u.id]) for u in users]
+    ranked = score_candidates_for_job(job_profile(job), candidates, top_k=None)
+    db.add_all([
+        MatchScore(user_id=m['user_id'], job_id=job.id, score=m['score'], reasoning=m['reasoning'])
+        for m in ranked
+    ])
+
+
+def refresh_user_matches(db, user):
+    """Re-score one worker against every active job that shares a skill or trade."""
+    db.query(MatchScore).filter_by(user_id=user.id).delete(synchronize_session=False)
+    if not user.resume_complete:
+        return
+
+    profile = user_profile(user)
+    jobs = candidate_jobs_query(db, user.skills, user.trade).all()
+    skills = linked_skill_names(db, JobSkill, [job.id for job in jobs])
+    matches = []
+    for job in jobs:
+        m = score_job_for_user(profile, job_profile(job, skills[job.id]))
+        matches.append(MatchScore(user_id=user.id, job_id=job.id, score=m['score'], reasoning=m['reasoning']))
+    db.add_all(matches)
+
+
+def get_user_matches(db, user_id, cursor=None, limit=None):
+    """Page of (MatchScore, Job, organization name) for a worker, best first.
+    Returns (rows, next_cursor)."""
+    query = (
+        db.query(MatchScore, Job, Organization.name)
+        .join(Job, Job.id == MatchScore.job_id)
+        .outerjoin(Organization, Organization.id == Job.organization_id)
+        .filter(MatchScore.user_id == user_id, Job.status == 'active')
+    )
+    return keyset_page(query, [(MatchScore.score, True), (MatchScore.job_id, False)],
+                       key=lambda row: (row[0].score, row[0].job_id), cursor=cursor, limit=limit)
+
+
+def get_job_matches(db, job_id, cursor=None, limit=None):
+    """Page of (MatchScore, User) for a job, best first. Returns (rows, next_cursor)."""
+    query = (
+        db.query(MatchScore, User)
+        .join(User, User.id == MatchScore.user_id)
+        .filter(MatchScore.job_id == job_id, User.resume_complete == 1)
+    )
+    return keyset_page(query, [(MatchScore.score, True), (MatchScore.user_id, False)],
+                       key=lambda row: (row[0].score, row[0].user_id), cursor=cursor, limit=limit)
+
+
+def get_match(db, user_id, job_id):
+    return db.query(MatchScore).filter_by(user_id=user_id, job_id=job_id).first()
+
+
+def rebuild_matches(db):
+    db.query(MatchScore).delete(synchronize_session=False)
+    for job in db.query(Job).filter_by(status='active').all():
+        refresh_job_matches(db, job)
+    db.commit()
+
+
+def ensure_matches(db):
+    """Backfill the table once for databases created before it existed."""
+    if db.query(MatchScore.id).first() is None:
+        rebuild_matches(db)
@@ -0,0 +1,40 @@
+import threading
+from collections import defaultdict, deque
+
+_WINDOW = 500
+
+_samples = defaultdict(lambda: deque(maxlen=_WINDOW))
+_counts = defaultdict(int)
+_lock = threading.Lock()
+
+
+def record(name, value):
+    with _lock:
+        _samples[name].append(value)
+        _counts[name] += 1
+
+
+def percentile(name, pct):
+    with _lock:
+        values = sorted(_samples.get(name, ()))
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def snapshot():
+    """Count plus avg/p50/p95 over the most recent samples of every metric."""
+    with _lock:
+        items = [(name, sorted(values), _counts[name]) for name, values in _samples.items()]
+    result = {}
+    for name, values, count in items:
+        if not values:
+            continue
+        result[name] = {
+            'count': count,
+            'avg': round(sum(values) / len(values), 2),
+            'p50': round(values[len(values) // 2], 2),
+            'p95': round(values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))], 2)
+        }
+    return result
@@ -0,0 +1,194 @@
+import time
+import threading
+from collections import defaultdict, deque
+from config import Config
+from utils import metrics
+from utils.llm_gateway import generate_content, stream_content, last_call_cached, last_call_shared
+
+PRO = 'gemini-2.5-pro'
+FLASH = 'gemini-2.5-flash'
+
+# Each call site names its task, which decides the models that may serve it
+# (in order of preference), and declares its own latency and cost budgets.
+TASKS = {
+    'chat': {'models': (FLASH,)},
+    'draft_update': {'models': (FLASH,)},
+    'skills': {'models': (FLASH,)},
+    'translation': {'models': (FLASH,)},
+    'match_rerank': {'models': (PRO, FLASH)},
+    'resume_content': {'models': (PRO, FLASH)},
+    'resume_extraction': {'models': (PRO, FLASH)},
+}
+
+_samples = defaultdict(lambda: deque(maxlen=200))
+_costs = defaultdict(lambda: deque(maxlen=200))
+_totals = defaultdict(lambda: defaultdict(float))
+_lock = threading.Lock()
+
+
+def _recent(model):
+    cutoff = time.monotonic() - Config.LLM_HEALTH_WINDOW_SECONDS
+    with _lock:
+        return [(latency, ok) for at, latency, ok in _samples[model] if at >= cutoff]
+
+
+def model_health(model):
+    """(p95 latency ms, error rate, sample count) over the health window."""
+    recent = _recent(model)
+    if not recent:
+        return None, 0.0, 0
+    latencies = sorted(latency for latency, ok in recent if ok)
+    p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))] if latencies else None
+    errors = sum(1 for _, ok in recent if not ok)
+    return p95, errors / len(recent), len(recent)
+
+
+def _healthy(model, latency_budget_ms):
+    p95, error_rate, count = model_health(model)
+    if count < Config.LLM_HEALTH_MIN_SAMPLES:
+        return True
+    if error_rate > Config.LLM_FALLBACK_ERROR_RATE:
+        return False
+    return p95 is None or latency_budget_ms is None or p95 <= latency_budget_ms
+
+
+def average_cost(task, model):
+    """Mean cost (USD) of one call to model for task over the health window, or
+    None without recent calls, so a model skipped for cost is tried again later."""
+    cutoff = time.monotonic() - Config.LLM_HEALTH_WINDOW_SECONDS
+    with _lock:
+        recent = [cost for at, cost in _costs[(task, model)] if at >= cutoff]
+    return sum(recent) / len(recent) if recent else None
+
+
+def _affordable(task, model, cost_budget_usd):
+    cost = average_cost(task, model)
+    return cost_budget_usd is None or cost is None or cost <= cost_budget_usd
+
+
+def choose_model(task, latency_budget_ms=None, cost_budget_usd=None):
+    """The task's first model that is healthy within the latency budget and
+    whose calls for this task have averaged within the cost budget, else its last."""
+    models = TASKS[task]['models']
+    for model in models[:-1]:
+        if _healthy(model, latency_budget_ms) and _affordable(task, model, cost_budget_usd):
+            return model
+    return models[-1]
+
+
+def _route(task, latency_budget_ms, cost_budget_usd):
+    model = choose_model(task, latency_budget_ms, cost_budget_usd)
+    if model != TASKS[task]['models'][0]:
+        _bump(task, 'fallbacks')
+    return model
+
+
+def _bump(task, name, amount=1):
+    with _lock:
+        _totals[task][name] += amount
+
+
+def _cost(model, response):
+    usage = getattr(response, 'usage_metadata', None)
+    price_in, price_out = Config.LLM_PRICE_PER_MILLION_TOKENS.get(model, (0.0, 0.0))
+    if usage is None:
+        return 0.0
+    tokens_in = usage.prompt_token_count or 0
+    tokens_out = (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)
+    return (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+
+
+def _record(task, model, started, ok, response=None, latency_budget_ms=None, cost_budget_usd=None):
+    latency_ms = (time.perf_counter() - started) * 1000
+    _bump(task, 'calls')
+    if not ok:
+        _bump(task, 'errors')
+    if latency_budget_ms is not None and latency_ms > latency_budget_ms:
+        _bump(task, 'over_latency_budget')
+    with _lock:
+        _samples[model].append((time.monotonic(), latency_ms, ok))
+    metrics.record(f'llm.{model}.latency_ms', latency_ms)
+    metrics.record(f'llm.task.{task}.latency_ms', latency_ms)
+    if response is not None:
+        cost = _cost(model, response)
+        _bump(task, 'cost_usd', cost)
+        _bump(task, f'calls.{model}')
+        with _lock:
+            _costs[(task, model)].append((time.monotonic(), cost))
+        if cost_budget_usd is not None and cost > cost_budget_usd:
+            _bump(task, 'over_cost_budget')
+
+
+def _deadline(latency_budget_ms):
+    """time.monotonic() by which a call with this latency budget gives up, retries included."""
+    if latency_budget_ms is None:
+        return None
+    return time.monotonic() + latency_budget_ms * Config.LLM_DEADLINE_BUDGET_FACTOR / 1000
+
+
+def _generate_on(task, model, contents, config, cache_ttl, latency_budget_ms, cost_budget_usd, deadline):
+    started = time.perf_counter()
+    try:
+        response = generate_content(model, contents, config=config, cache_ttl=cache_ttl, deadline=deadline)
+    except Exception:
+        # A caller that joined another's in-flight call shares its error; that
+        # call already recorded it
+        if not last_call_shared():
+            _record(task, model, started, ok=False, latency_budget_ms=latency_budget_ms)
+        raise
+    if last_call_cached():
+        _bump(task, 'cache_hits')
+    elif last_call_shared():
+        _bump(task, 'coalesced')
+    else:
+        _record(task, model, started, ok=True, response=response,
+                latency_budget_ms=latency_budget_ms, cost_budget_usd=cost_budget_usd)
+    return response
+
+
+def generate(task, contents, config=None, cache_ttl=None, latency_budget_ms=None, cost_budget_usd=None):
+    """generate_content for a task type on the model the router picks for the
+    caller's latency budget (ms) and per-call cost budget (USD). If the
+    preferred model fails, the task's last (cheapest, fastest) model is tried once,
+    provided a full latency budget remains before the call's deadline
+    (LLM_DEADLINE_BUDGET_FACTOR x the latency budget)."""
+    model = _route(task, latency_budget_ms, cost_budget_usd)
+    fallback = TASKS[task]['models'][-1]
+    deadline = _deadline(latency_budget_ms)
+    try:
+        return _generate_on(task, model, contents, config, cache_ttl, latency_budget_ms, cost_budget_usd, deadline)
+    except Exception as e:
+        if model == fallback or (deadline is not None and deadline - time.monotonic() < latency_budget_ms / 1000):
+            raise
+        print(f"{model} failed for {task}, falling back to {fallback}: {e}")
+        _bump(task, 'fallbacks')
+        return _generate_on(task, fallback, contents, config, cache_ttl, latency_budget_ms, cost_budget_usd, deadline)
+
+
+def stream(task, contents, config=None, latency_budget_ms=None, cost_budget_usd=None):
+    """stream_content for a task type; latency is recorded when the stream ends."""
+    model = _route(task, latency_budget_ms, cost_budget_usd)
+    started = time.perf_counter()
+    last = None
+    try:
+        for chunk in stream_content(model, contents, config=config, deadline=_deadline(latency_budget_ms)):
+            last = chunk
+            yield chunk
+    except Exception:
+        _record(task, model, started, ok=False, latency_budget_ms=latency_budget_ms)
+        raise
+    # Usage metadata arrives on the final chunk
+    _record(task, model, started, ok=True, response=last,
+            latency_budget_ms=latency_budget_ms, cost_budget_usd=cost_budget_usd)
+
+
+def router_stats():
+    with _lock:
+        tasks = {task: {k: round(v, 6) if k == 'cost_usd' else int(v) for k, v in values.items()}
+                 for task, values in _totals.items()}
+    models = {}
+    for model in (PRO, FLASH):
+        p95, error_rate, count = model_health(model)
+        models[model] = {'p95_ms': round(p95, 1) if p95 is not None else None,
+                         'error_rate': round(error_rate, 3), 'samples': count}
+    return {'tasks': tasks, 'models': models}
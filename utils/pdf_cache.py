@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import hashlib
+from config import Config
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PDF_TEMPLATE_FILES = [
+    os.path.join(_ROOT, 'templates', 'worker', 'resume_pdf.html'),
+    os.path.join(_ROOT, 'static', 'css', 'resume_pdf.css'),
+]
+
+
+def _template_version():
+    # Editing the PDF template or its stylesheet changes every key, so stale renders are never served
+    digest = hashlib.sha256()
+    for path in PDF_TEMPLATE_FILES:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b'missing')
+    return digest.hexdigest()[:16]
+
+
+TEMPLATE_VERSION = _template_version()
+
+
+def pdf_key(user_data):
+    payload = json.dumps({
+        'user': user_data,
+        'template': TEMPLATE_VERSION
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def pdf_path(user_id, key):
+    return os.path.abspath(os.path.join(Config.PDF_CACHE_DIR, f"{user_id}_{key}.pdf"))
+
+
+def cached_pdf(user_id, key):
+    """Path of a cached render, or None. A hit refreshes the file's age for eviction."""
+    path = pdf_path(user_id, key)
+    try:
+        os.utime(path)
+        return path
+    except OSError:
+        return None
+
+
+def render_to_cache(user_id, key, render):
+    """Run render(tmp_path) and move the result into place atomically."""
+    path = pdf_path(user_id, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        if not render(tmp_path):
+            return None
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    evict()
+    return path
+
+
+def evict(max_bytes=None, max_age=None):
+    """Drop renders older than max_age, then the least recently used until under max_bytes."""
+    max_bytes = Config.PDF_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = Config.PDF_CACHE_MAX_AGE_SECONDS if max_age is None else max_age
+    try:
+        names = [n for n in os.listdir(Config.PDF_CACHE_DIR) if n.endswith('.pdf')]
+    except OSError:
+        return 0
+
+    now = time.time()
+    files = []
+    for name in names:
+        path = os.path.join(Config.PDF_CACHE_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in files:
+        if now - mtime <= max_age and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+            total -= size
+        except OSError:
+            pass
+    return removed
@@ -1,5 +1,5 @@
-from weasyprint import HTML, CSS
 from flask import render_template
+from utils.pdf_renderer import render_pdf
 import os
 
 
@@ -40,8 +40,10 @@ def generate_pdf_resume_from_html(user_data, categorized_skills, output_path):
             categorized_skills=categorized_skills
         )
         
-        # Generate PDF from HTML
-        HTML(string=html_content).write_pdf(output_path)
+        # Generate PDF from HTML in the render pool
+        pdf_bytes = render_pdf(html_content)
+        with open(output_path, 'wb') as f:
+            f.write(pdf_bytes)
         
         return True
     
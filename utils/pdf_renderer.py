@@ -0,0 +1,142 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from utils import metrics
+
+STYLESHEET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'static', 'css', 'resume_pdf.css')
+
+# Rendering is CPU-bound, so it runs in worker processes rather than on the
+# threads serving web traffic. Each worker imports WeasyPrint, builds its font
+# configuration and parses the stylesheet once, then reuses them per render.
+_pool = None
+_pool_failed = False
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(Config.PDF_RENDER_QUEUE_SIZE)
+_depth = 0
+_depth_lock = threading.Lock()
+
+# Per-process state (render workers, or the web process when the pool is off)
+_stylesheet = None
+_font_config = None
+
+
+class RenderBusyError(RuntimeError):
+    """Raised when the render queue stays full past PDF_RENDER_WAIT_SECONDS."""
+
+
+def _init_worker():
+    global _stylesheet, _font_config
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+    _font_config = FontConfiguration()
+    _stylesheet = CSS(filename=STYLESHEET, font_config=_font_config)
+
+
+def _render(html):
+    if _stylesheet is None:
+        _init_worker()
+    from weasyprint import HTML
+    return HTML(string=html).write_pdf(stylesheets=[_stylesheet], font_config=_font_config)
+
+
+def _warm():
+    return os.getpid()
+
+
+def _mp_context():
+    # Never fork the (multi-threaded) web process itself: workers come from a
+    # forkserver, or are spawned where that isn't available.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def init_pool():
+    """Start the render workers. Called at startup, and again after a worker
+    crash broke the pool."""
+    global _pool, _pool_failed
+    if Config.PDF_RENDER_WORKERS <= 0 or _pool_failed:
+        return None
+    with _pool_lock:
+        if _pool is None and not _pool_failed:
+            pool = ProcessPoolExecutor(
+                max_workers=Config.PDF_RENDER_WORKERS,
+                mp_context=_mp_context(),
+                initializer=_init_worker
+            )
+            try:
+                for future in [pool.submit(_warm) for _ in range(Config.PDF_RENDER_WORKERS)]:
+                    future.result()
+                _pool = pool
+            except Exception as e:
+                # Usually WeasyPrint's system libraries are missing; render
+                # in-process instead so the error surfaces per request.
+                print(f"PDF render pool unavailable, rendering in-process: {e}")
+                pool.shutdown(wait=False, cancel_futures=True)
+                _pool_failed = True
+    return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _adjust_depth(delta):
+    global _depth
+    with _depth_lock:
+        _depth += delta
+        return _depth
+
+
+def _release_slot(_future=None):
+    _adjust_depth(-1)
+    _slots.release()
+
+
+def render_pdf(html):
+    """Render an HTML document to PDF bytes through the bounded render queue."""
+    if not _slots.acquire(timeout=Config.PDF_RENDER_WAIT_SECONDS):
+        raise RenderBusyError("PDF render queue is full")
+    metrics.record('pdf_queue_depth', _adjust_depth(1))
+    start = time.perf_counter()
+    future = None
+    try:
+        pool = _pool or init_pool()
+        if pool is None:
+            return _render(html)
+        try:
+            future = pool.submit(_render, html)
+            # The slot is freed when the render finishes, not when this caller
+            # stops waiting, so a timed-out render still counts against the queue
+            future.add_done_callback(_release_slot)
+            return future.result(timeout=Config.PDF_RENDER_TIMEOUT_SECONDS)
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault); start a fresh pool for the next render
+            _reset_pool(pool)
+            raise
+        except FutureTimeout:
+            future.cancel()
+            raise
+    finally:
+        if future is None:
+            _release_slot()
+        metrics.record('pdf_render_ms', (time.perf_counter() - start) * 1000)
+
+
+def stats():
+    return {
+        'workers': Config.PDF_RENDER_WORKERS if _pool else 0,
+        'queue_depth': _depth,
+        'queue_limit': Config.PDF_RENDER_QUEUE_SIZE
+    }
@@ -1,27 +1,9 @@
-import os
 import json
-from google import genai
 from google.genai import types
 from config import Config
+from utils.model_router import generate
 
 
-_client = None
-
-def get_client():
-    global _client
-    if _client is None:
-        api_key = (
-            os.environ.get("GEMINI_API_KEY")
-            or os.environ.get("GOOGLE_API_KEY")
-            or getattr(Config, "GEMINI_API_KEY", None)
-        )
-        if api_key:
-            api_key = api_key.strip().strip('"').strip("'")
-        if not api_key:
-            raise ValueError("Gemini API key not configured. Set GEMINI_API_KEY (or GOOGLE_API_KEY) in your environment.")
-        _client = genai.Client(api_key=api_key)
-    return _client
-
 def generate_ats_resume_content(user_data):
     prompt = f"""Generate a professional, ATS-friendly, one-page resume for a blue-collar worker.
 
@@ -42,12 +24,15 @@ One page maximum.
 Return plain text resume."""
     
     try:
-        response = get_client().models.generate_content(
-            model="gemini-2.5-pro",
+        response = generate(
+            'resume_content',
             contents=prompt,
             config=types.GenerateContentConfig(
                 temperature=0.3
-            )
+            ),
+            cache_ttl=Config.LLM_CACHE_TTL_RESUME,
+            latency_budget_ms=20000,
+            cost_budget_usd=0.05
         )
         
         return response.text if response.text else "Resume generation failed"
@@ -1,34 +1,18 @@
-import os
 import json
-from google import genai
 from google.genai import types
 from config import Config
+from utils.model_router import generate
+from utils.skill_taxonomy import CATEGORIES, categorize_skills
 
 
-_client = None
-
-def get_client():
-    global _client
-    if _client is None:
-        api_key = (
-            os.environ.get("GEMINI_API_KEY")
-            or os.environ.get("GOOGLE_API_KEY")
-            or getattr(Config, "GEMINI_API_KEY", None)
-        )
-        if api_key:
-            api_key = api_key.strip().strip('"').strip("'")
-        if not api_key:
-            raise ValueError("Gemini API key not configured. Set GEMINI_API_KEY (or GOOGLE_API_KEY) in your environment.")
-        _client = genai.Client(api_key=api_key)
-    return _client
-
-def extract_and_categorize_skills(skills_list, trade):
+def categorize_with_model(skills_list, trade):
+    """Categorize skills the taxonomy doesn't know, in one model call. Returns None on failure."""
     prompt = f"""You are a skills categorization expert for blue-collar trades.
     
 Trade: {trade}
 Raw skills: {', '.join(skills_list)}
 
-Normalize, expand, and categorize these skills into:
+Normalize and categorize only these skills into:
 1. Technical Skills - trade-specific abilities
 2. Soft Skills - communication, teamwork, problem-solving
 3. Tools & Equipment - specific tools they can use
@@ -43,26 +27,48 @@ Return JSON:
 Make skills professional and ATS-friendly."""
     
     try:
-        response = get_client().models.generate_content(
-            model="gemini-2.5-flash",
+        response = generate(
+            'skills',
             contents=prompt,
             config=types.GenerateContentConfig(
                 response_mime_type="application/json"
-            )
+            ),
+            cache_ttl=Config.LLM_CACHE_TTL_SKILLS,
+            latency_budget_ms=6000,
+            cost_budget_usd=0.005
         )
         
         if response.text:
             return json.loads(response.text)
-        return {
-            "technical_skills": skills_list,
-            "soft_skills": [],
-            "tools_equipment": []
-        }
+        return None
     
     except Exception as e:
         print(f"Error categorizing skills: {e}")
-        return {
-            "technical_skills": skills_list,
-            "soft_skills": [],
-            "tools_equipment": []
-        }
+        return None
+
+
+def extract_and_categorize_skills(skills_list, trade):
+    # Known skills are resolved from the local taxonomy; only the leftovers
+    # cost a model call.
+    categorized, unknown = categorize_skills(skills_list, trade)
+    return complete_categories(categorized, unknown, trade)
+
+
+def complete_categories(categorized, unknown, trade):
+    """The locally categorized skills plus the unknown ones as the model categorizes them.
+    The dict passed in is left unchanged."""
+    if not unknown:
+        return categorized
+    return _merge_categories(categorized, unknown, categorize_with_model(unknown, trade))
+
+
+def _merge_categories(categorized, unknown, from_model):
+    categorized = {category: list(skills) for category, skills in categorized.items()}
+    if not isinstance(from_model, dict):
+        from_model = {"technical_skills": unknown}
+    
+    for category in CATEGORIES:
+        for skill in from_model.get(category) or []:
+            if isinstance(skill, str) and skill not in categorized[category]:
+                categorized[category].append(skill)
+    return categorized
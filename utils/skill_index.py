@@ -0,0 +1,47 @@
+from sqlalchemy import select, func, or_, false
+from models.skill import UserSkill, JobSkill, SkillWord, skill_words
+from models.user import User
+from models.job import Job
+
+# Candidate retrieval runs on the normalized skill tables (models/skill.py):
+# a row qualifies by linking to a skill that shares a word with the other
+# side's skills or trade, or by having the same trade.
+
+
+def index_tokens(skills, trade):
+    tokens = skill_words(trade)
+    for skill in skills or []:
+        tokens |= skill_words(skill)
+    return tokens
+
+
+def _owners_sharing_words(owner_column, link_class, tokens):
+    return (
+        select(owner_column)
+        .join(SkillWord, SkillWord.skill_id == link_class.skill_id)
+        .where(SkillWord.word.in_(sorted(tokens)))
+    )
+
+
+def _same_trade(column, trade):
+    trade = (trade or '').strip().lower()
+    # Matches the func.lower(trade) indexes on users and jobs
+    return func.lower(column) == trade if trade else false()
+
+
+def candidate_users_query(db, skills, trade):
+    """Workers with a finished resume sharing a skill word or the trade."""
+    tokens = index_tokens(skills, trade)
+    return db.query(User).filter(
+        User.resume_complete == 1,
+        or_(User.id.in_(_owners_sharing_words(UserSkill.user_id, UserSkill, tokens)), _same_trade(User.trade, trade))
+    )
+
+
+def candidate_jobs_query(db, skills, trade):
+    """Active jobs sharing a skill word or the trade."""
+    tokens = index_tokens(skills, trade)
+    return db.query(Job).filter(
+        Job.status == 'active',
+        or_(Job.id.in_(_owners_sharing_words(JobSkill.job_id, JobSkill, tokens)), _same_trade(Job.trade, trade))
+    )
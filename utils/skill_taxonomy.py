@@ -0,0 +1,98 @@
+import os
+import json
+import difflib
+import threading
+from functools import lru_cache
+from models.skill import skill_key
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'data', 'skill_taxonomy.json')
+CATEGORIES = ('technical_skills', 'soft_skills', 'tools_equipment')
+
+# Aliases shorter than this only match exactly; fuzzy matching them is mostly noise
+FUZZY_MIN_LENGTH = 5
+FUZZY_CUTOFF = 0.88
+
+_table = None
+_keys = ()
+_table_lock = threading.Lock()
+
+
+def _word_sorted(key):
+    return ' '.join(sorted(key.split()))
+
+
+def _load():
+    """Flatten the taxonomy file into {alias key: (canonical, category, trades), ...}
+    once, so each lookup is a dict probe."""
+    global _table, _keys
+    with _table_lock:
+        if _table is not None:
+            return _table
+        with open(TAXONOMY_PATH, encoding='utf-8') as f:
+            taxonomy = json.load(f)
+
+        table = {}
+        for category in CATEGORIES:
+            for name, spec in taxonomy.get(category, {}).items():
+                entry = (name, category, frozenset(skill_key(t) for t in spec.get('trades', [])))
+                for alias in [name] + spec.get('synonyms', []):
+                    key = skill_key(alias)
+                    for k in {key, _word_sorted(key)}:
+                        if k and entry not in table.setdefault(k, []):
+                            table[k].append(entry)
+
+        _keys = tuple(k for k in table if len(k) >= FUZZY_MIN_LENGTH)
+        _table = {k: tuple(v) for k, v in table.items()}
+        return _table
+
+
+def _pick(entries, trade_key):
+    # Same alias can mean different skills per trade ("fitting" for a plumber vs a carpenter)
+    for entry in entries:
+        if trade_key in entry[2]:
+            return entry
+    for entry in entries:
+        if not entry[2]:
+            return entry
+    return entries[0]
+
+
+@lru_cache(maxsize=4096)
+def lookup_skill(name, trade=None):
+    """(canonical name, category) for a raw skill, or None if it isn't in the taxonomy."""
+    table = _table if _table is not None else _load()
+    key = skill_key(name)
+    if not key:
+        return None
+
+    entries = table.get(key) or table.get(_word_sorted(key))
+    if not entries and len(key) >= FUZZY_MIN_LENGTH:
+        close = difflib.get_close_matches(key, _keys, n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            entries = table[close[0]]
+    if not entries:
+        return None
+
+    canonical, category, _ = _pick(entries, skill_key(trade))
+    return canonical, category
+
+
+def categorize_skills(skills_list, trade=None):
+    """Sort skills into the resume categories using the taxonomy alone.
+
+    Returns (categorized, unknown): categorized has every category key with
+    de-duplicated canonical names; unknown lists the raw skills not found.
+    """
+    categorized = {category: [] for category in CATEGORIES}
+    unknown = []
+    for skill in skills_list or []:
+        found = lookup_skill(skill, trade)
+        if found is None:
+            if skill_key(skill) and skill not in unknown:
+                unknown.append(skill)
+            continue
+        canonical, category = found
+        if canonical not in categorized[category]:
+            categorized[category].append(canonical)
+    return categorized, unknown
@@ -0,0 +1,127 @@
+import uuid
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from models.database import SessionLocal
+from models.task import BackgroundTask
+
+# Task state lives in the database so any gunicorn worker can answer a status
+# poll; execution happens on a small thread pool in the enqueueing process,
+# off the request threads.
+_registry = {}
+_app = None
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def task(kind):
+    """Register a function as the handler for a task kind. Handlers receive the
+    JSON payload and return a JSON-serializable result."""
+    def decorator(fn):
+        _registry[kind] = fn
+        return fn
+    return decorator
+
+
+def init_app(app):
+    global _app
+    _app = app
+    _requeue_unfinished()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=Config.TASK_WORKERS, thread_name_prefix='task')
+    return _executor
+
+
+def enqueue(kind, payload, user_id=None, org_id=None):
+    if kind not in _registry:
+        raise ValueError(f"Unknown task kind: {kind}")
+
+    task_id = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        record = BackgroundTask(id=task_id, kind=kind, user_id=user_id, org_id=org_id, status='queued')
+        record.payload = payload
+        db.add(record)
+        db.commit()
+    finally:
+        db.close()
+
+    _get_executor().submit(_run, task_id)
+    return task_id
+
+
+def _run(task_id):
+    db = SessionLocal()
+    try:
+        # Atomic claim, so a task re-queued by several workers runs only once
+        claimed = db.query(BackgroundTask).filter_by(id=task_id, status='queued').update(
+            {'status': 'running', 'started_at': datetime.utcnow()}, synchronize_session=False
+        )
+        db.commit()
+        if not claimed:
+            return
+        record = db.query(BackgroundTask).filter_by(id=task_id).first()
+        kind, payload = record.kind, record.payload
+    finally:
+        db.close()
+
+    try:
+        with _app.app_context():
+            result = _registry[kind](payload)
+        status, error = 'done', None
+    except Exception as e:
+        print(f"Background task {kind} ({task_id}) failed: {e}")
+        result, status, error = None, 'failed', str(e)
+
+    db = SessionLocal()
+    try:
+        record = db.query(BackgroundTask).filter_by(id=task_id).first()
+        record.status = status
+        record.result = result
+        record.error = error
+        record.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _requeue_unfinished():
+    """Pick up tasks left queued when the process last stopped, and tasks whose
+    worker died mid-run (running for longer than TASK_STALE_SECONDS)."""
+    stale_before = datetime.utcnow() - timedelta(seconds=Config.TASK_STALE_SECONDS)
+    db = SessionLocal()
+    try:
+        db.query(BackgroundTask).filter(
+            BackgroundTask.status == 'running', BackgroundTask.started_at < stale_before
+        ).update({'status': 'queued'}, synchronize_session=False)
+        db.commit()
+        task_ids = [t.id for t in db.query(BackgroundTask.id).filter_by(status='queued')]
+    finally:
+        db.close()
+    for task_id in task_ids:
+        _get_executor().submit(_run, task_id)
+
+
+def get_task(task_id):
+    db = SessionLocal()
+    try:
+        return db.query(BackgroundTask).filter_by(id=task_id).first()
+    finally:
+        db.close()
+
+
+def task_status(record):
+    return {
+        'task_id': record.id,
+        'kind': record.kind,
+        'status': record.status,
+        'result': record.result,
+        'error': record.error
+    }
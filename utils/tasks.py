@@ -0,0 +1,208 @@
+import json
+from sqlalchemy import func
+from models.database import SessionLocal
+from models.user import User
+from models.chat_state import ChatState
+from utils import task_queue
+from utils.task_queue import task
+from utils.ai_assistant import ResumeAssistant
+from utils.skill_extractor import extract_and_categorize_skills, complete_categories
+from utils.skill_taxonomy import categorize_skills
+from utils.resume_generator import generate_ats_resume_content
+from utils.ai_pipeline import run_pipeline
+from utils.pdf_generator import generate_pdf_resume_from_html
+from utils.match_store import refresh_user_matches
+from utils import pdf_cache
+from utils.translator import translate_many, release_untranslated
+
+
+def resume_pdf_source(user):
+    """(user_data, cache key) for a worker's PDF. The key covers the stored resume
+    fields and raw skills only, so it never depends on a model reply."""
+    user_data = resume_user_data(user, None)
+    return user_data, pdf_cache.pdf_key(user_data)
+
+
+def render_resume_pdf_to_cache(user_id, user_data, key):
+    """Categorize the skills and render the PDF into the cache; returns its path or None."""
+    categorized_skills = extract_and_categorize_skills(user_data['skills'], user_data['trade'])
+    user_data = dict(user_data, categorized_skills=categorized_skills)
+    # Generate PDF using WeasyPrint for pixel-perfect HTML-to-PDF conversion
+    return pdf_cache.render_to_cache(
+        user_id, key,
+        lambda path: generate_pdf_resume_from_html(user_data, categorized_skills, path)
+    )
+
+
+def resume_preview_stages(user):
+    """Pipeline stages (see utils/ai_pipeline.py) for the preview page's
+    categorized_skills and resume_content. Generation starts from the locally
+    categorized skills, so it runs alongside the model call that categorizes the rest."""
+    skills, trade = user.skills, user.trade
+    user_data = resume_user_data(user, None)
+    return {
+        'local_skills': (lambda: categorize_skills(skills, trade), ()),
+        'categorized_skills': (lambda local_skills: complete_categories(*local_skills, trade), ('local_skills',)),
+        'resume_content': (lambda local_skills: generate_ats_resume_content(dict(user_data, categorized_skills=local_skills[0])),
+                           ('local_skills',)),
+    }
+
+
+def resume_user_data(user, categorized_skills):
+    return {
+        'name': user.name,
+        'phone': user.phone,
+        'trade': user.trade,
+        'experience_years': user.experience_years,
+        'location': user.location,
+        'skills': user.skills,
+        'categorized_skills': categorized_skills,
+        'education': user.education,
+        'certifications': user.certifications,
+        'work_history': user.work_history
+    }
+
+
+def apply_resume_data(db, user, resume_data):
+    user.name = resume_data.get('name', user.name)
+    user.trade = resume_data.get('trade', user.trade)
+    user.experience_years = resume_data.get('experience_years', user.experience_years)
+    user.location = resume_data.get('location', user.location)
+    user.education = resume_data.get('education', user.education)
+    user.certifications = resume_data.get('certifications', user.certifications)
+    user.skills = resume_data.get('skills', [])
+    user.work_history = resume_data.get('work_history', [])
+    user.resume_complete = 1
+    refresh_user_matches(db, user)
+
+
+# How many times a draft update starts over after losing a race with another
+# update (possibly in another gunicorn worker) before leaving the messages
+# pending for the next one
+DRAFT_UPDATE_ATTEMPTS = 3
+
+
+def _merge_pending_once(user_id):
+    """One draft update. True if the draft now covers the messages that were
+    pending, False if the extraction failed, None if another update won."""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter_by(id=user_id).first()
+        state = db.query(ChatState).filter_by(user_id=user_id).first()
+        pending = (state.pending_messages or 0) if state else 0
+        if pending <= 0:
+            return True
+        version = state.draft_version or 0
+        messages = (user.chat_history or [])[-pending:]
+        assistant = ResumeAssistant(language=user.language, summary=state.summary)
+    finally:
+        # Don't hold a read transaction open across the model call
+        db.close()
+
+    if not assistant.update_draft(messages):
+        return False
+
+    db = SessionLocal()
+    try:
+        # Compare-and-set: an update that landed meanwhile bumped draft_version,
+        # so this draft is stale and is dropped. Turns recorded meanwhile only
+        # add to pending_messages, so subtracting what was merged keeps them.
+        claimed = db.query(ChatState).filter(
+            ChatState.user_id == user_id,
+            func.coalesce(ChatState.draft_version, 0) == version,
+            ChatState.pending_messages >= pending
+        ).update({
+            'pending_messages': ChatState.pending_messages - pending,
+            'draft_version': version + 1,
+            'summary_json': json.dumps(assistant.summary)
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+    return True if claimed else None
+
+
+def merge_pending_messages(user_id):
+    """Merge the chat messages not yet in the draft into it. Returns False if
+    they are still pending afterwards; the next update retries them."""
+    for _ in range(DRAFT_UPDATE_ATTEMPTS):
+        merged = _merge_pending_once(user_id)
+        if merged is not None:
+            return merged
+    return False
+
+
+@task('update_chat_draft')
+def update_chat_draft(payload):
+    """Extract resume fields from the latest chat turns, off the chat request."""
+    return {'merged': merge_pending_messages(payload['user_id'])}
+
+
+@task('finalize_resume')
+def finalize_resume(payload):
+    """Turn the chat draft into the worker's resume once the assistant says COMPLETE."""
+    merge_pending_messages(payload['user_id'])
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter_by(id=payload['user_id']).first()
+        state = db.query(ChatState).filter_by(user_id=user.id).first()
+        assistant = ResumeAssistant(language=user.language, summary=state.summary if state else {})
+        apply_resume_data(db, user, assistant.finalize_resume_data(user.chat_history))
+        db.commit()
+    finally:
+        db.close()
+
+    # Build the preview speculatively in its own task; if the browser gets there
+    # first, the page joins the calls still in flight
+    task_queue.enqueue('warm_resume_preview', {'user_id': payload['user_id']}, user_id=payload['user_id'])
+    return {'redirect': '/worker/resume/preview'}
+
+
+@task('warm_resume_preview')
+def warm_resume_preview(payload):
+    """Run the preview page's model calls ahead of time so they are cache hits."""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter_by(id=payload['user_id']).first()
+        preview_stages = resume_preview_stages(user)
+    finally:
+        db.close()
+
+    run_pipeline(preview_stages)
+    return {'warmed': sorted(preview_stages)}
+
+
+@task('resume_pdf')
+def render_resume_pdf(payload):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter_by(id=payload['user_id']).first()
+        user_data, key = resume_pdf_source(user)
+    finally:
+        db.close()
+
+    download_url = f"/worker/resume/pdf/{key}"
+    if pdf_cache.cached_pdf(payload['user_id'], key):
+        return {'download_url': download_url}
+
+    if not render_resume_pdf_to_cache(payload['user_id'], user_data, key):
+        raise RuntimeError('PDF generation failed')
+
+    return {'download_url': download_url}
+
+
+@task('translate_phrases')
+def translate_phrases(payload):
+    """Fill the translation memory for template phrases that rendered untranslated."""
+    phrases = [tuple(pair) for pair in payload['phrases']]
+    by_language = {}
+    for text, language in phrases:
+        by_language.setdefault(language, []).append(text)
+    try:
+        for language, texts in by_language.items():
+            translate_many(texts, language)
+    finally:
+        # Anything still untranslated can be queued again by the next page
+        release_untranslated(phrases)
+    return {'translated': len(phrases)}
@@ -1,47 +1,186 @@
 import os
-from google import genai
+import json
+import hashlib
+import threading
+from collections import OrderedDict
 from google.genai import types
+from sqlalchemy.exc import IntegrityError
 from config import Config
+from models.database import SessionLocal
+from models.translation import Translation
+from utils.model_router import generate
 
-_client = None
+PHRASES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'phrases.json')
 
-def get_client():
-    global _client
-    if _client is None:
-        api_key = (
-            os.environ.get("GEMINI_API_KEY")
-            or os.environ.get("GOOGLE_API_KEY")
-            or getattr(Config, "GEMINI_API_KEY", None)
-        )
-        if api_key:
-            api_key = api_key.strip().strip('"').strip("'")
-        if not api_key:
-            raise ValueError("Gemini API key not configured. Set GEMINI_API_KEY (or GOOGLE_API_KEY) in your environment.")
-        _client = genai.Client(api_key=api_key)
-    return _client
+LANGUAGE_MAP = {
+    'hi': 'Hindi',
+    'en': 'English',
+    'or': 'Odia'
+}
 
-def translate_text(text, target_language='hi'):
-    if target_language == 'en':
-        return text
-    
-    language_map = {
-        'hi': 'Hindi',
-        'en': 'English',
-        'or': 'Odia'
-    }
-    
-    target_lang_name = language_map.get(target_language, 'Hindi')
-    
-    prompt = f"Translate the following text to {target_lang_name}. Return only the translation:\n\n{text}"
+# Translation memory: the translations table is the persistent store, and this
+# bounded LRU in front of it lets templates localize without touching the
+# database or the model.
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+# (text, language) pairs with a translate_phrases task already queued in this
+# process, so pages rendered before it finishes don't queue them again
+_queued = set()
+_queued_lock = threading.Lock()
+
+TRANSLATIONS_SCHEMA = types.Schema(type=types.Type.ARRAY, items=types.Schema(type=types.Type.STRING))
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _remember(key, translated):
+    with _memory_lock:
+        _memory[key] = translated
+        _memory.move_to_end(key)
+        while len(_memory) > Config.TRANSLATION_MEMORY_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _recall(key):
+    with _memory_lock:
+        translated = _memory.get(key)
+        if translated is not None:
+            _memory.move_to_end(key)
+        return translated
+
+
+def cached_translation(text, target_language):
+    """Translation from memory only, or None. Never blocks on I/O."""
+    return _recall((source_hash(text), target_language))
+
+
+def claim_untranslated(pairs):
+    """Mark pairs as queued for translation; returns the ones that weren't already."""
+    with _queued_lock:
+        fresh = set(pairs) - _queued
+        _queued.update(fresh)
+    return fresh
+
+
+def release_untranslated(pairs):
+    """Forget queued pairs once their task has finished, translated or not."""
+    with _queued_lock:
+        _queued.difference_update(pairs)
+
+
+def _store(db, target_language, pairs):
+    for text, translated in pairs:
+        try:
+            with db.begin_nested():
+                db.add(Translation(source_hash=source_hash(text), target_language=target_language,
+                                   source_text=text, translated_text=translated))
+        except IntegrityError:
+            pass
+    db.commit()
+
+
+def _translate_with_model(texts, target_language):
+    target_lang_name = LANGUAGE_MAP.get(target_language, 'Hindi')
+    prompt = (
+        f"Translate each string in this JSON array to {target_lang_name}. "
+        f"Return a JSON array with only the translations, in the same order:\n\n"
+        f"{json.dumps(texts, ensure_ascii=False)}"
+    )
     
     try:
-        response = get_client().models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
+        response = generate(
+            'translation',
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=TRANSLATIONS_SCHEMA
+            ),
+            latency_budget_ms=10000,
+            cost_budget_usd=0.005
         )
         
-        return response.text if response.text else text
+        translated = json.loads(response.text) if response.text else None
+        if isinstance(translated, list) and len(translated) == len(texts) \
+                and all(isinstance(t, str) and t for t in translated):
+            return translated
+        print("Translation error: model returned a mismatched batch")
+        return None
     
     except Exception as e:
         print(f"Translation error: {e}")
-        return text
+        return None
+
+
+def translate_many(texts, target_language='hi'):
+    """Translate a list of strings: memory first, then the translations table,
+    then one model call for whatever is left. Untranslatable strings come back unchanged."""
+    texts = list(texts)
+    if target_language == 'en':
+        return texts
+
+    found = {}
+    missing = []
+    for text in texts:
+        if not text or not text.strip() or text in found or text in missing:
+            continue
+        translated = _recall((source_hash(text), target_language))
+        if translated is None:
+            missing.append(text)
+        else:
+            found[text] = translated
+
+    if missing:
+        db = SessionLocal()
+        try:
+            by_hash = {source_hash(t): t for t in missing}
+            rows = db.query(Translation.source_hash, Translation.translated_text).filter(
+                Translation.target_language == target_language,
+                Translation.source_hash.in_(list(by_hash))
+            )
+            for hash_, translated in rows:
+                found[by_hash[hash_]] = translated
+                _remember((hash_, target_language), translated)
+
+            missing = [t for t in missing if t not in found]
+            translated = _translate_with_model(missing, target_language) if missing else None
+            if translated:
+                pairs = list(zip(missing, translated))
+                _store(db, target_language, pairs)
+                for text, value in pairs:
+                    found[text] = value
+                    _remember((source_hash(text), target_language), value)
+        finally:
+            db.close()
+
+    return [found.get(text, text) for text in texts]
+
+
+def translate_text(text, target_language='hi'):
+    return translate_many([text], target_language)[0]
+
+
+def preload_phrases(path=PHRASES_PATH):
+    """Seed the translation memory from the shipped phrase file."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            phrases = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not load phrase file: {e}")
+        return
+
+    db = SessionLocal()
+    try:
+        for target_language, mapping in phrases.items():
+            known = {h for (h,) in db.query(Translation.source_hash).filter(
+                Translation.target_language == target_language,
+                Translation.source_hash.in_([source_hash(t) for t in mapping])
+            )}
+            _store(db, target_language, [(t, v) for t, v in mapping.items() if source_hash(t) not in known])
+            for text, translated in mapping.items():
+                _remember((source_hash(text), target_language), translated)
+    finally:
+        db.close()